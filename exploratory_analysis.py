@@ -1,30 +1,46 @@
 from collections.abc import Reversible
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import streamlit as st
-from wordcloud import WordCloud
 import altair as alt
-from collections import Counter
+
+import eda_summary
+import instrumentation
+import startup_profile
+import wordclouds
+from chart_reduction import bin_frame
+
+#-------------------------------------------- 
+'''
+this function loads the precomputed EDA aggregates for the current dataset version
+'''
+@instrumentation.traced("exploratory_analysis.load_summary")
+@st.cache_data(show_spinner="Calculando o resumo do dataset...")
+def load_summary(version, _dataset=None):
+    with startup_profile.get_profile("main").span("resumo da AED"):
+        return eda_summary.load_summary(_dataset)
+
+def token_count_series(summary):
+    counts = summary["num_tokens_counts"]
+    return pd.Series(list(counts.values()), index=[int(k) for k in counts]).sort_index()
 
 #-------------------------------------------- 
 '''
 this function is to display the amount of tokens per comment 
 '''
-def plot_token_histogram(df):
+@instrumentation.traced("exploratory_analysis.plot_token_histogram", payload=False)
+def plot_token_histogram(summary):
     st.header("Número de Tokens por Comentário")
-    token_counts = df["review_text_tokenized"].map(len) 
-    st.bar_chart(token_counts.value_counts().sort_index())
+    instrumentation.chart("gráfico: tokens por comentário", st.bar_chart, token_count_series(summary))
 
 #-------------------------------------------- 
 '''
 this function is to display the distribution of tokens per comment
 '''
-def plot_token_distribution(df):
-    df['token_count'] = df['review_text_tokenized'].apply(len)
-
-    # Conta quantos comentários têm cada número de tokens
-    token_summary = df['token_count'].value_counts().sort_index().reset_index()
+@instrumentation.traced("exploratory_analysis.plot_token_distribution", payload=False)
+def plot_token_distribution(summary):
+    # Quantos comentários têm cada número de tokens
+    token_summary = token_count_series(summary).reset_index()
     token_summary.columns = ['Nº de Tokens','Nº de Comentários']
 
     # Exibe como tabela no Streamlit
@@ -35,12 +51,12 @@ def plot_token_distribution(df):
 '''
 this function is to display the distribution of comments by rating 
 '''
-def plot_class_distribution(df):
+@instrumentation.traced("exploratory_analysis.plot_class_distribution", payload=False)
+def plot_class_distribution(summary):
     st.subheader("Distribuição de Comentários por Avaliação")
 
-    # Conta quantos comentários existem por polaridade
-    polarity_counts = df['rating'].value_counts().reset_index()
-    polarity_counts.columns = ['Avaliação', 'Quantidade']
+    # Quantos comentários existem por avaliação
+    polarity_counts = pd.DataFrame(list(summary["rating_counts"].items()), columns=['Avaliação', 'Quantidade'])
 
     # Converte os valores de polaridade em string para forçar o eixo X a ser categórico
     polarity_counts['Avaliação'] = polarity_counts['Avaliação'].astype(str)
@@ -55,30 +71,21 @@ def plot_class_distribution(df):
         color='Avaliação:N'
     )
 
-    st.altair_chart(chart, use_container_width=True)   
+    instrumentation.chart("gráfico: comentários por avaliação", st.altair_chart, chart, use_container_width=True)   
 
 #--------------------------------------------
 '''
 this function is to show the most common words 
 '''
-def show_most_common_tokens(df):
+@instrumentation.traced("exploratory_analysis.show_most_common_tokens", payload=False)
+def show_most_common_tokens(summary):
     st.subheader("Palavras Mais Comuns")
 
     # Permitir ao usuário escolher quantos tokens quer visualizar
     n = st.slider("Quantidade de palavras mais comuns a exibir", min_value=5, max_value=150, value=10)
     
-    df["review_text_tokenized"] = df["review_text_tokenized"].apply(lambda x: x.split() if isinstance(x, str) else x)
-
-    all_tokens = [token for sublist in df["review_text_tokenized"] for token in sublist]
-     
-    # contar tokens (palavras)
-    token_counts = Counter(all_tokens)
-
-    # Obter os N mais comuns
-    most_common_tokens = token_counts.most_common(n)
-
-    # Transformar em DataFrame para exibir
-    common_df = pd.DataFrame(most_common_tokens, columns=["Token", "Frequência"])
+    # Contagens pré-calculadas no resumo do dataset
+    common_df = pd.DataFrame(summary["top_tokens"][:n], columns=["Token", "Frequência"])
 
     # Exibir tabela sem índice
     #st.table(common_df.style.set_properties(**{'text-align':'left'}))
@@ -88,20 +95,15 @@ def show_most_common_tokens(df):
 '''
 this function is display the correlation between rating and text length 
 '''
-def analyze_rating_length_correlation(df):
+@instrumentation.traced("exploratory_analysis.analyze_rating_length_correlation", payload=False)
+def analyze_rating_length_correlation(summary):
     st.subheader("Correlação entre Avaliação e Comprimento do Texto")
-    df = df.copy()  # Isso evita modificar o DataFrame original 
-    # Calcula comprimento do texto (versão segura para strings ou listas)
-    df['text_length'] = df['review_text_tokenized'].apply(
-        lambda x: len(x.split()) if isinstance(x, str) else len(x))
     
     # Filtro opcional para outliers (com checkbox)
-    if st.checkbox("Remover outliers extremos (5% superiores)"):
-        max_length = df['text_length'].quantile(0.95)
-        df = df[df['text_length'] <= max_length]
+    remove_outliers = st.checkbox("Remover outliers extremos (5% superiores)")
    
-    # 2. Cálculo da Correlação
-    correlation = df[['rating', 'text_length']].corr().iloc[0, 1]
+    # 2. Correlação pré-calculada (com e sem o corte do percentil 95)
+    correlation = summary["correlation"]["p95" if remove_outliers else "all"]
     # explicar o que é a correlação (pearson)
     
     # Exibe métrica com cor condicional
@@ -114,57 +116,76 @@ def analyze_rating_length_correlation(df):
     """, unsafe_allow_html=True)
     
     # 3. Gráfico de Dispersão Aprimorado
+    # Densidade em faixas de comprimento + amostra estratificada por avaliação + reta ajustada no servidor
     st.markdown("Relação Quantitativa")
-    scatter = alt.Chart(df).mark_circle(
+    reduced = summary["length_scatter"]["p95" if remove_outliers else "all"]
+    x_axis = alt.X('rating:O', 
+                   title='Avaliação (1-5)',
+                   axis=alt.Axis(labelAngle=0, grid=False),
+                   scale=alt.Scale(domain=[1, 2, 3, 4, 5]))
+    density = alt.Chart(bin_frame(reduced["bins"]).rename(columns={'y': 'rating'})).mark_rect(opacity=0.8).encode(
+        x=x_axis,
+        y=alt.Y('x0:Q', 
+                title='Número de Palavras',
+                scale=alt.Scale(zero=False)),
+        y2='x1:Q',
+        color=alt.Color('count:Q', 
+                       scale=alt.Scale(type='log', scheme='greys'),
+                       title='Comentários'),
+        tooltip=['rating', 'x0', 'x1', 'count']
+    )
+    scatter = alt.Chart(pd.DataFrame(reduced["sample"])).mark_circle(
         size=60,
         opacity=0.6,
         stroke='#333',
         strokeWidth=1
     ).encode(
-        x=alt.X('rating:O', 
-                title='Avaliação (1-5)',
-                axis=alt.Axis(labelAngle=0, grid=False),
-                scale=alt.Scale(domain=[1, 2, 3, 4, 5])),
-        y=alt.Y('text_length:Q', 
-                title='Número de Palavras',
-                scale=alt.Scale(zero=False)),
+        x=x_axis,
+        y='num_tokens:Q',
         color=alt.Color('rating:N', 
                        scale=alt.Scale(scheme='redyellowgreen'),
                        legend=None),
-        tooltip=['rating', 'text_length']
-    ).properties(
-        width=700,
-        height=400
+        tooltip=['rating', 'num_tokens']
     )
     
-    # Adiciona linha de tendência
-    trend_line = scatter.transform_regression(
-        'rating', 'text_length'
-    ).mark_line(color='red', size=2)
+    # Adiciona linha de tendência (regressão calculada com NumPy)
+    fit = reduced["fit"]
+    ratings = np.arange(1, 6)
+    trend_line = alt.Chart(pd.DataFrame({
+        'rating': ratings, 'num_tokens': fit["slope"] * ratings + fit["intercept"]
+    })).mark_line(color='red', size=2).encode(x=x_axis, y='num_tokens:Q')
     
-    st.altair_chart(scatter + trend_line, use_container_width=True)
+    instrumentation.chart("gráfico: dispersão avaliação x comprimento", st.altair_chart, (density + scatter + trend_line).properties(
+        width=700,
+        height=400
+    ), use_container_width=True)
     
     # 4. Boxplot Aprimorado
     st.markdown("Distribuição Detalhada por Avaliação")
-    boxplot = alt.Chart(df).mark_boxplot(
-        extent='min-max',
-        size=30,
-        color='rating:N'
-    ).encode(
+    # Caixas desenhadas a partir dos quantis pré-calculados
+    box_stats = summary["box_num_tokens_p95" if remove_outliers else "box_num_tokens"]
+    box_df = pd.DataFrame([{'rating': int(k), **v} for k, v in box_stats.items()])
+    base = alt.Chart(box_df).encode(
         x=alt.X('rating:O', 
                 title='Avaliação',
                 axis=alt.Axis(labelAngle=0)),
-        y=alt.Y('text_length:Q', 
-                title='Comprimento do Texto (palavras)',
-                scale=alt.Scale(zero=False)),
         color=alt.Color('rating:N', 
                        scale=alt.Scale(scheme='redyellowgreen'),
                        legend=None)
-    ).properties(
+    )
+    whiskers = base.mark_rule().encode(
+        y=alt.Y('min:Q', 
+                title='Comprimento do Texto (palavras)',
+                scale=alt.Scale(zero=False)),
+        y2='max:Q'
+    )
+    boxes = base.mark_bar(size=30).encode(y='q1:Q', y2='q3:Q')
+    medians = base.mark_tick(size=30, color='white', thickness=2).encode(y='median:Q')
+    boxplot = (whiskers + boxes + medians).properties(
         width=700
     )
     
-    st.altair_chart(boxplot, use_container_width=True)
+    instrumentation.chart("gráfico: boxplot por avaliação", st.altair_chart, boxplot, use_container_width=True)
     
     # 5. Análise Textual Complementar
     st.markdown("Insights Explicativos")
@@ -179,7 +200,15 @@ def analyze_rating_length_correlation(df):
 '''
 this function is to display the comparative word cloud correlation with rating   
 '''
-def plot_comparative_wordclouds(df):
+@instrumentation.traced("exploratory_analysis.wordcloud_png")
+@st.cache_data(show_spinner=False)
+def wordcloud_png(version, ratings, colormap, max_words=100):
+    # Uma imagem por (intervalo de ratings, paleta, max_words), gerada a partir das frequências do resumo
+    tables = load_summary(version)["word_frequencies_by_rating"]
+    return wordclouds.render_png(wordclouds.merge_frequencies(tables, ratings), colormap, max_words)
+
+@instrumentation.traced("exploratory_analysis.plot_comparative_wordclouds", payload=False)
+def plot_comparative_wordclouds(summary):
     st.subheader("Nuvens de Palavras por Avaliação")
     
     # Widgets interativos
@@ -189,43 +218,28 @@ def plot_comparative_wordclouds(df):
     with col2:
         rating_max = st.selectbox("Avaliação máxima", [2, 3, 4, 5], index=3)
     
-    # Filtra os dados
-    df_low = df[df['rating'].between(rating_min, 2)]
-    df_high = df[df['rating'].between(4, rating_max)]
-    
-    # Processamento do texto
-    text_low = " ".join(review for review in df_low['review_text_tokenized'].apply(lambda x: " ".join(x) if isinstance(x, list) else x))
-    text_high = " ".join(review for review in df_high['review_text_tokenized'].apply(lambda x: " ".join(x) if isinstance(x, list) else x))
-    
-    # Configuração das nuvens
-    wc_low = WordCloud(
-        width=800, height=400,
-        background_color='white',
-        colormap='Reds',  # Paleta para sentimentos negativos
-        max_words=100
-    ).generate(text_low)
+    # Intervalos de ratings: as tabelas de frequência de cada rating são somadas
+    ratings_low = tuple(range(rating_min, 3))
+    ratings_high = tuple(range(4, rating_max + 1))
     
-    wc_high = WordCloud(
-        width=800, height=400,
-        background_color='white',
-        colormap='Greens',  # Paleta para sentimentos positivos
-        max_words=100
-    ).generate(text_high)
-    
-    # Exibição
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 8))
-    ax1.imshow(wc_low, interpolation='bilinear')
-    ax1.set_title(f"Palavras em Avaliações {rating_min}-2 Estrelas", fontsize=14)
-    ax1.axis('off')
-    
-    ax2.imshow(wc_high, interpolation='bilinear')
-    ax2.set_title(f"Palavras em Avaliações 4-{rating_max} Estrelas", fontsize=14)
-    ax2.axis('off')
-    
-    st.pyplot(fig)
+    # Exibição (Reds para sentimentos negativos, Greens para positivos)
+    col1, col2 = st.columns(2)
+    for col, ratings, colormap, title in (
+        (col1, ratings_low, 'Reds', f"Palavras em Avaliações {rating_min}-2 Estrelas"),
+        (col2, ratings_high, 'Greens', f"Palavras em Avaliações 4-{rating_max} Estrelas"),
+    ):
+        with col:
+            st.markdown(f"##### {title}")
+            png = wordcloud_png(summary["version"], ratings, colormap, max_words=100)
+            if png:
+                st.image(png, use_container_width=True)
+            else:
+                st.info("Nenhum comentário nesse intervalo de avaliações.")
 #--------------------------------------------
 
-def streamlit_show(df):
+def streamlit_show(dataset):
+    # `dataset` é a DatasetView compartilhada: só é lida, nunca alterada
+    summary = load_summary(eda_summary.dataset_version(dataset.version), dataset)
 
     # Link como texto formatado
     st.markdown(
@@ -242,12 +256,12 @@ def streamlit_show(df):
     st.title("Análise Exploratória do Dataset de Polaridade")
     # colocar onde é possível encontrar o dataset 
     with st.expander("Métricas Numéricas", expanded=True):
-        analyze_rating_length_correlation(df)
-        plot_class_distribution(df) 
+        analyze_rating_length_correlation(summary)
+        plot_class_distribution(summary) 
 
     with st.expander("Análise de Palavras", expanded=True): 
-        show_most_common_tokens(df)
-        plot_comparative_wordclouds(df)   
-        plot_token_histogram(df)
-        plot_token_distribution(df) 
+        show_most_common_tokens(summary)
+        plot_comparative_wordclouds(summary)   
+        plot_token_histogram(summary)
+        plot_token_distribution(summary) 
                  
@@ -24,6 +24,8 @@
             python-pkgs.numpy
             python-pkgs.matplotlib
             python-pkgs.pandas
+            python-pkgs.pyarrow
+            python-pkgs.scipy
             python-pkgs.transformers
             python-pkgs.datasets
             python-pkgs.seqeval
@@ -34,6 +36,9 @@
             python-pkgs.nltk
             python-pkgs.pyzipper
             python-pkgs.glob2
+            python-pkgs.uvicorn
+            python-pkgs.onnx
+            python-pkgs.onnxruntime
           ]))
         ];
       };
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+'''
+Anota o corpus com o spaCy em lote (nlp.pipe) e grava, por documento, os
+arrays de tokens, POS, dependências e índices dos núcleos num arquivo Parquet.
+Em seguida regenera os CSVs agregados (pos_tags.csv e dep_parse.csv) usados
+pela página PLN Clássica.
+
+Como no dataset_code.ipynb, as POS-tags vêm de review_text e as dependências
+de review_text_clean; quando as duas colunas são iguais o corpus é anotado
+uma única vez.
+
+Uso (a partir da pasta interface):
+    python annotate_corpus.py --batch-size 256 --n-process 4
+'''
+import argparse
+import time
+from itertools import islice
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import spacy
+
+import dataset_store
+
+SPACY_MODEL = "pt_core_news_sm"
+# Para POS e dependências bastam tok2vec, morphologizer, parser e attribute_ruler
+DISABLED_COMPONENTS = ("ner", "lemmatizer", "senter")
+OUTPUT = dataset_store.BASE_DIR / "models_results" / "part_1" / "annotations.parquet"
+POS_CSV = dataset_store.BASE_DIR / "models_results" / "part_1" / "pos_tags.csv"
+DEP_CSV = dataset_store.BASE_DIR / "models_results" / "part_1" / "dep_parse.csv"
+
+
+def load_pipeline(model=SPACY_MODEL):
+    return spacy.load(model, exclude=list(DISABLED_COMPONENTS))
+
+
+def annotate(nlp, texts, batch_size, n_process):
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+        yield (
+            [t.text for t in doc],
+            [t.pos_ for t in doc],
+            [t.dep_ for t in doc],
+            [t.head.i for t in doc],
+        )
+
+
+def _schema(columns):
+    fields = [pa.field("doc_id", pa.int64())]
+    for col in columns:
+        fields += [
+            pa.field(f"{col}_tokens", pa.list_(pa.string())),
+            pa.field(f"{col}_pos", pa.list_(pa.string())),
+            pa.field(f"{col}_dep", pa.list_(pa.string())),
+            pa.field(f"{col}_head", pa.list_(pa.int32())),
+        ]
+    return pa.schema(fields)
+
+
+'''
+this function runs a single nlp.pipe stream per text column and writes the
+per-document arrays to parquet in chunks, returning the number of documents
+'''
+def annotate_corpus(df, columns, output, batch_size=256, n_process=1, chunk_size=10000):
+    nlp = load_pipeline()
+    schema = _schema(columns)
+    # Um único pipe por coluna: os processos do n_process são criados uma só vez
+    streams = {
+        col: annotate(nlp, df[col].fillna("").astype(str), batch_size, n_process)
+        for col in columns
+    }
+    n_docs = 0
+    with pq.ParquetWriter(output, schema, compression="zstd") as writer:
+        while n_docs < len(df):
+            size = min(chunk_size, len(df) - n_docs)
+            data = {"doc_id": list(range(n_docs, n_docs + size))}
+            for col, stream in streams.items():
+                tokens, pos, dep, head = zip(*islice(stream, size))
+                data.update({
+                    f"{col}_tokens": list(tokens),
+                    f"{col}_pos": list(pos),
+                    f"{col}_dep": list(dep),
+                    f"{col}_head": list(head),
+                })
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+            n_docs += size
+    return n_docs
+
+
+def frequency_table(values, label):
+    counts = values.explode().dropna().value_counts()
+    return pd.DataFrame({label: counts.index, "Freq": counts.values, "Percent": counts.values / counts.sum() * 100})
+
+
+def write_aggregates(annotations, pos_column, dep_column, pos_csv=POS_CSV, dep_csv=DEP_CSV):
+    table = pq.read_table(annotations, columns=[f"{pos_column}_pos", f"{dep_column}_dep"]).to_pandas()
+    frequency_table(table[f"{pos_column}_pos"], "POS").to_csv(pos_csv, index=False)
+    frequency_table(table[f"{dep_column}_dep"], "Dep").to_csv(dep_csv, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="CSV ou Parquet de entrada (padrão: dataset_all)")
+    parser.add_argument("--pos-column", default="review_text")
+    parser.add_argument("--dep-column", default="review_text_clean")
+    parser.add_argument("--output", default=str(OUTPUT))
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--n-process", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    columns = list(dict.fromkeys([args.pos_column, args.dep_column]))
+    if args.input is None:
+        df = dataset_store.load_dataset_all(columns=columns)
+    elif args.input.endswith(".parquet"):
+        df = pd.read_parquet(args.input, columns=columns)
+    else:
+        df = pd.read_csv(args.input, usecols=columns)
+
+    start = time.perf_counter()
+    n_docs = annotate_corpus(df, columns, args.output, args.batch_size, args.n_process, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"{n_docs} documentos anotados em {elapsed:.1f}s ({n_docs / elapsed:.1f} docs/s) -> {args.output}")
+
+    write_aggregates(args.output, args.pos_column, args.dep_column)
+    print(f"Agregados salvos em {POS_CSV} e {DEP_CSV}")
+
+
+if __name__ == "__main__":
+    main()
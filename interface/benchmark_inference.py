@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+'''
+Mede a vazão (textos/s) do classificador BERT, comparando a inferência
+texto a texto com a inferência em lotes de inference.predict_batch.
+
+Uso (a partir da pasta interface):
+    python benchmark_inference.py --n 2000 --batch-sizes 1 8 32 64
+'''
+import argparse
+import json
+import time
+
+import pandas as pd
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from inference import predict_batch
+
+MODEL_PATH = "models_results/part_2/final_model_weights"
+
+
+def load_texts(source, n):
+    if source.endswith(".json"):
+        with open(source, "r", encoding="utf-8") as f:
+            texts = json.load(f)
+    else:
+        texts = pd.read_csv(source, usecols=["review_text"])["review_text"].dropna().astype(str).tolist()
+    # Repete o conjunto até atingir n textos
+    return (texts * (n // len(texts) + 1))[:n]
+
+
+def sequential(texts, tokenizer, model):
+    with torch.no_grad():
+        for text in texts:
+            inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True)
+            model(**inputs).logits.argmax().item()
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--source", default="data/frases.json", help="frases.json ou CSV com a coluna review_text")
+    parser.add_argument("--n", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForSequenceClassification.from_pretrained(args.model).eval()
+    texts = load_texts(args.source, args.n)
+
+    # Aquecimento
+    predict_batch(texts[:16], tokenizer, model, batch_size=8)
+
+    elapsed = timed(sequential, texts, tokenizer, model)
+    print(f"{'sequencial':>12}: {len(texts) / elapsed:8.1f} textos/s ({elapsed:.2f}s)")
+    for batch_size in args.batch_sizes:
+        elapsed = timed(predict_batch, texts, tokenizer, model, batch_size=batch_size)
+        print(f"{f'lote={batch_size}':>12}: {len(texts) / elapsed:8.1f} textos/s ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+'''
+Suíte de benchmarks dos caminhos críticos do projeto, sobre corpora sintéticos
+de avaliações em português no formato do b2w (10k, 100k e 1M linhas por padrão).
+
+Casos:
+    ingest_b2w     zip -> Parquet tipado (extracting_dataset / dataset_store)
+    dataset_view   leitura do Parquet + colunas derivadas (load_dataframe das páginas de AED)
+    eda_summary    todos os agregados da análise exploratória
+    ngrams         n-gramas mais frequentes por sentimento
+    wordcloud      tabelas de frequência por rating + PNG da nuvem de palavras
+    preprocessing  limpeza, tokenização e stopwords (preprocessing.py)
+    lexicon        semantic_sentiment: spaCy + SentiLex (lexicon_scoring.score_texts)
+    bert           predict_sentiment em lotes (inference.predict_batch)
+
+Cada caso roda num processo novo, para que o pico de memória (RSS) de um não
+contamine o outro; o tempo é o melhor de --repeat execuções. Os casos que
+dependem de um modelo ou pacote ausente são marcados como ignorados. Os
+resultados (com o commit, a versão do Python e das bibliotecas) são salvos em
+JSON e podem ser comparados entre commits com --compare.
+
+Uso:
+    python interface/benchmark_suite.py --sizes 10000 100000
+    python interface/benchmark_suite.py --compare benchmark_results/antes.json benchmark_results/depois.json
+'''
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from importlib import metadata
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import dataset_store
+
+DATA_DIR = dataset_store.BASE_DIR / "data" / "benchmarks"
+RESULTS_DIR = dataset_store.BASE_DIR.parent / "benchmark_results"
+SIZES = (10000, 100000, 1000000)
+SEED = 0
+PACKAGES = ("numpy", "pandas", "pyarrow", "scipy", "spacy", "torch", "transformers", "onnxruntime")
+
+# Fragmentos usados para montar as avaliações sintéticas
+PRODUCTS = ["o produto", "a entrega", "o celular", "a geladeira", "o notebook", "a embalagem", "o vendedor", "a televisão"]
+POSITIVE = ["ótimo", "excelente", "bom", "perfeito", "rápido", "bonito", "recomendo", "maravilhoso"]
+NEGATIVE = ["ruim", "péssimo", "horrível", "defeituoso", "lento", "quebrado", "decepcionante", "atrasado"]
+INTENSIFIERS = ["muito", "bem", "super", "bastante", "pouco"]
+FILLERS = [
+    "chegou antes do prazo", "veio conforme o anúncio", "comprei para minha mãe", "uso todos os dias",
+    "não funcionou direito", "tive que trocar", "atendimento respondeu rápido", "vale o preço",
+    "demorou para chegar", "a qualidade surpreendeu", "o acabamento deixa a desejar", "faltou o manual",
+]
+MAX_FRAGMENTS = 8
+
+
+def _fragments(words):
+    return [f"{p} é {i} {w}" for p in PRODUCTS for i in INTENSIFIERS for w in words]
+
+
+'''
+this function builds a reproducible b2w-shaped frame whose wording follows the rating
+'''
+def synthetic_reviews(n, seed=SEED):
+    rng = np.random.default_rng(seed)
+    positive = np.array(_fragments(POSITIVE) + FILLERS, dtype=object)
+    negative = np.array(_fragments(NEGATIVE) + FILLERS, dtype=object)
+
+    rating = rng.choice([1, 2, 3, 4, 5], size=n, p=[0.15, 0.07, 0.12, 0.25, 0.41])
+    n_fragments = rng.integers(1, MAX_FRAGMENTS + 1, size=n)
+    pos_ids = rng.integers(0, len(positive), size=(n, MAX_FRAGMENTS))
+    neg_ids = rng.integers(0, len(negative), size=(n, MAX_FRAGMENTS))
+    # Rating 3 mistura fragmentos dos dois lados
+    use_positive = (rating[:, None] > 3) | ((rating[:, None] == 3) & (rng.random((n, MAX_FRAGMENTS)) < 0.5))
+    fragments = np.where(use_positive, positive[pos_ids], negative[neg_ids])
+
+    processed = [" ".join(row[:k]) for row, k in zip(fragments, n_fragments)]
+    text = [", ".join(row[:k]).capitalize() + "." for row, k in zip(fragments, n_fragments)]
+    polarity = np.where(rating > 3, 1.0, np.where(rating < 3, 0.0, np.nan))
+    return pd.DataFrame({
+        "original_index": np.arange(n),
+        "review_text": text,
+        "review_text_processed": processed,
+        "review_text_tokenized": [str(p.split()) for p in processed],
+        "polarity": polarity,
+        "rating": rating,
+        "kfold_polarity": np.where(np.isnan(polarity), np.nan, np.arange(n) % 5),
+        "kfold_rating": np.arange(n) % 5,
+    })
+
+
+def corpus_paths(n, data_dir=DATA_DIR):
+    data_dir = Path(data_dir)
+    return data_dir / f"b2w_{n}.csv.zip", data_dir / f"b2w_{n}.parquet"
+
+
+def ensure_corpus(n, data_dir=DATA_DIR):
+    # Os corpora são gerados uma vez por tamanho e reaproveitados nas próximas execuções
+    archive, store = corpus_paths(n, data_dir)
+    if archive.exists() and store.exists():
+        return archive, store
+    archive.parent.mkdir(parents=True, exist_ok=True)
+    df = synthetic_reviews(n)
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(f"b2w_{n}.csv", df.to_csv(index=False))
+    dataset_store.write_store(dataset_store.to_store_types(df), store)
+    return archive, store
+
+
+def _view(store):
+    from dataset_view import COLUMNS, DatasetView
+    return DatasetView.from_frame(pd.read_parquet(store, columns=COLUMNS), "benchmark")
+
+
+# Cada caso recebe (n, data_dir), prepara as entradas fora da medição e devolve
+# uma função sem argumentos que executa o caminho medido e retorna as linhas processadas
+def case_ingest_b2w(n, data_dir):
+    archive, _ = corpus_paths(n, data_dir)
+    dest = Path(data_dir) / f"_ingest_{n}.parquet"
+    return lambda: dataset_store.ingest_b2w(archive, dest) and n
+
+
+def case_dataset_view(n, data_dir):
+    _, store = corpus_paths(n, data_dir)
+    return lambda: len(_view(store))
+
+
+def case_eda_summary(n, data_dir):
+    import eda_summary
+    view = _view(corpus_paths(n, data_dir)[1])
+    return lambda: eda_summary.compute_summary(view)["n_rows"]
+
+
+def case_ngrams(n, data_dir):
+    from ngram_counter import top_ngrams
+    view = _view(corpus_paths(n, data_dir)[1])
+    sentiment = np.where(view["polarity"] > 0, "Positivo", "Negativo")
+    return lambda: top_ngrams(view["review_text_processed"], sentiment) and len(view)
+
+
+def case_wordcloud(n, data_dir):
+    import wordclouds
+    import wordcloud  # noqa: F401 - o render importa o pacote sob demanda; falha aqui se ele não existir
+    from corpus_index import CorpusIndex
+    from eda_summary import WORDCLOUD_TERMS
+    view = _view(corpus_paths(n, data_dir)[1])
+    ratings = view["rating"].to_numpy()
+
+    def run():
+        index = CorpusIndex.build(view["tokens"])
+        tables = {str(r): index.most_common(WORDCLOUD_TERMS, mask=ratings == r).values.tolist() for r in np.unique(ratings)}
+        wordclouds.render_png(wordclouds.merge_frequencies(tables, range(1, 6)))
+        return len(view)
+    return run
+
+
+def case_preprocessing(n, data_dir):
+    import preprocessing
+    texts = pd.read_parquet(corpus_paths(n, data_dir)[1], columns=["review_text"])
+    stopwords = preprocessing.load_stopwords()
+    return lambda: len(preprocessing.preprocess_frame(texts, stopwords=stopwords))
+
+
+def case_lexicon(n, data_dir):
+    import lexicon_scoring
+    import model_registry
+    nlp, lexicon = model_registry.get_spacy(), model_registry.get_lexicon()
+    texts = pd.read_parquet(corpus_paths(n, data_dir)[1], columns=["review_text"])["review_text"].tolist()
+    return lambda: len(lexicon_scoring.score_texts(nlp, texts, lexicon))
+
+
+def case_bert(n, data_dir):
+    import model_registry
+    from inference import predict_batch
+    tokenizer, model = model_registry.get_bert()
+    texts = pd.read_parquet(corpus_paths(n, data_dir)[1], columns=["review_text"])["review_text"].tolist()
+    return lambda: len(predict_batch(texts, tokenizer, model)[0])
+
+
+# Nome -> (preparação, maior número de linhas medido; None = sem limite)
+CASES = {
+    "ingest_b2w": (case_ingest_b2w, None),
+    "dataset_view": (case_dataset_view, None),
+    "eda_summary": (case_eda_summary, None),
+    "ngrams": (case_ngrams, None),
+    "wordcloud": (case_wordcloud, None),
+    "preprocessing": (case_preprocessing, None),
+    "lexicon": (case_lexicon, 20000),
+    "bert": (case_bert, 2000),
+}
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+'''
+this function runs one case in the current (fresh) process and returns its measurements
+'''
+def run_case(name, n, data_dir, repeat):
+    setup, _ = CASES[name]
+    try:
+        run = setup(n, data_dir)
+    except (ImportError, OSError, LookupError) as e:
+        return {"status": "ignorado", "motivo": f"{type(e).__name__}: {e}"}
+    gc.collect()
+    rss_before = _rss_mb()
+    times, rows = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = run()
+        times.append(time.perf_counter() - start)
+        gc.collect()
+    best = min(times)
+    return {
+        "status": "ok",
+        "linhas": int(rows),
+        "tempo_s": best,
+        "tempos_s": times,
+        "linhas_por_s": rows / best if best else None,
+        "rss_antes_mb": rss_before,
+        "pico_rss_mb": peak_rss_mb(),
+    }
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=dataset_store.BASE_DIR)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def environment():
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "commit": _git_commit(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "pacotes": versions,
+        "seed": SEED,
+    }
+
+
+def run_suite(cases, sizes, repeat, data_dir=DATA_DIR):
+    results = []
+    spawn = get_context("spawn")
+    for n in sizes:
+        ensure_corpus(n, data_dir)
+        for name in cases:
+            limit = CASES[name][1]
+            if limit is not None and n > limit:
+                result = {"status": "ignorado", "motivo": f"limite de {limit} linhas"}
+            else:
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                    result = pool.submit(run_case, name, n, str(data_dir), repeat).result()
+            result = {"caso": name, "linhas_entrada": n, **result}
+            results.append(result)
+            print(format_result(result))
+    return {"ambiente": environment(), "resultados": results}
+
+
+def format_result(result):
+    head = f"{result['caso']:>14} n={result['linhas_entrada']:<8}"
+    if result["status"] != "ok":
+        return f"{head} ignorado ({result['motivo']})"
+    return (f"{head} {result['tempo_s']:8.2f}s {result['linhas_por_s']:12.0f} linhas/s "
+            f"pico RSS {result['pico_rss_mb']:7.0f} MB")
+
+
+def compare(before, after):
+    key = lambda r: (r["caso"], r["linhas_entrada"])
+    old = {key(r): r for r in before["resultados"] if r["status"] == "ok"}
+    print(f"{before['ambiente']['commit']} -> {after['ambiente']['commit']}")
+    for result in after["resultados"]:
+        previous = old.get(key(result))
+        if result["status"] != "ok" or previous is None:
+            continue
+        ratio = result["tempo_s"] / previous["tempo_s"]
+        print(f"{result['caso']:>14} n={result['linhas_entrada']:<8} {previous['tempo_s']:8.2f}s -> {result['tempo_s']:8.2f}s "
+              f"({ratio:5.2f}x) | pico RSS {previous['pico_rss_mb']:.0f} -> {result['pico_rss_mb']:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", default=str(DATA_DIR), help="pasta dos corpora sintéticos")
+    parser.add_argument("--output", help=f"JSON de resultados (padrão: {RESULTS_DIR.name}/<data>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("ANTES", "DEPOIS"), help="compara dois JSON de resultados")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f, open(args.compare[1], encoding="utf-8") as g:
+            compare(json.load(f), json.load(g))
+        return
+
+    report = run_suite(args.cases, args.sizes, args.repeat, args.data_dir)
+    env = report["ambiente"]
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{env['data'][:19].replace(':', '')}-{env['commit'] or 'sem-commit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()
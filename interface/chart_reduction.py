@@ -0,0 +1,80 @@
+'''
+Redução no servidor dos gráficos de dispersão: em vez de enviar todas as
+linhas ao navegador, os gráficos recebem uma grade de contagens (x em faixas
+por valor de y), a reta de regressão calculada com NumPy e uma amostra
+estratificada de tamanho fixo para os pontos sobrepostos. O tamanho do que é
+desenhado não depende do tamanho do corpus.
+'''
+import numpy as np
+import pandas as pd
+
+SCATTER_BINS = 40
+SCATTER_SAMPLE = 1000
+
+
+'''
+this function counts the rows in each (x bin, y value) cell, for a numeric x and a discrete y
+'''
+def binned_counts(x, y, bins=SCATTER_BINS):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y)
+    if len(x) == 0:
+        return {"edges": [], "y": [], "counts": []}
+    edges = np.histogram_bin_edges(x, bins=bins)
+    levels, y_codes = np.unique(y, return_inverse=True)
+    n_bins = len(edges) - 1
+    x_codes = np.clip(np.searchsorted(edges, x, side="right") - 1, 0, n_bins - 1)
+    counts = np.bincount(y_codes * n_bins + x_codes, minlength=len(levels) * n_bins)
+    return {"edges": edges.tolist(), "y": levels.tolist(), "counts": counts.reshape(len(levels), n_bins).tolist()}
+
+
+'''
+this function fits y = slope * x + intercept by least squares
+'''
+def linear_fit(x, y):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) == 0:
+        return {"slope": 0.0, "intercept": 0.0}
+    if np.ptp(x) == 0:
+        return {"slope": 0.0, "intercept": float(y.mean())}
+    slope, intercept = np.polyfit(x, y, 1)
+    return {"slope": float(slope), "intercept": float(intercept)}
+
+
+'''
+this function keeps at most n rows, split evenly between the groups of `by`
+'''
+def stratified_sample(frame, by, n=SCATTER_SAMPLE, random_state=0):
+    n_groups = max(frame[by].nunique(), 1)
+    per_group = max(1, n // n_groups)
+    return frame.sample(frac=1, random_state=random_state).groupby(by, sort=True).head(per_group)
+
+
+'''
+this function reduces a scatter of (x, y) to binned counts, the regression of
+`fit_y` on `fit_x` and a bounded stratified sample of `columns`
+'''
+def reduce_scatter(frame, x, y, fit_x, fit_y, columns, n_sample=SCATTER_SAMPLE, bins=SCATTER_BINS):
+    frame = frame.dropna(subset=list(dict.fromkeys([x, y, fit_x, fit_y])))
+    sample = stratified_sample(frame[columns], y, n_sample)
+    return {
+        "bins": binned_counts(frame[x], frame[y], bins),
+        "fit": linear_fit(frame[fit_x], frame[fit_y]),
+        "sample": {col: sample[col].tolist() for col in columns},
+    }
+
+
+def bin_frame(bins):
+    # Grade de contagens em formato longo (uma linha por célula não vazia)
+    edges = np.asarray(bins["edges"])
+    if len(edges) == 0:
+        return pd.DataFrame(columns=["x0", "x1", "y", "count"])
+    counts = np.asarray(bins["counts"])
+    frame = pd.DataFrame({
+        "x0": np.tile(edges[:-1], len(bins["y"])),
+        "x1": np.tile(edges[1:], len(bins["y"])),
+        "y": np.repeat(bins["y"], len(edges) - 1),
+        "count": counts.ravel(),
+    })
+    return frame[frame["count"] > 0].reset_index(drop=True)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+'''
+Léxico SentiLex compilado: um artefato construído uma única vez e carregado
+com memory-map por todos os processos.
+
+- hashes.npy / polarity.npy: hashes de 64 bits (ordenados) das formas e lemas
+  do léxico e as polaridades em int8; a busca é um np.searchsorted vetorizado.
+  Como os arquivos são abertos com mmap, vários processos compartilham as
+  mesmas páginas de memória em vez de manter cada um a sua cópia do dict.
+- multiword.json: entradas com mais de um token (ex.: "à-vontade"), que são
+  casadas sobre a sequência de tokens por um autômato de Aho-Corasick, tanto
+  nas formas do texto quanto nos lemas ("abriu o coração" -> "abrir o coração").
+
+Uso (a partir da pasta interface):
+    python compiled_lexicon.py
+'''
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SENTILEX_PATH = Path(__file__).resolve().parent / "models_results" / "part_1" / "sentilex.csv"
+COMPILED_DIR = SENTILEX_PATH.with_name("sentilex_compiled")
+PIECE_PATTERN = r"\w+|[^\w\s]"
+
+
+def _hash(word):
+    return int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def hash_words(words):
+    # Cada palavra distinta é hasheada uma única vez
+    codes, uniques = pd.factorize(pd.Series(words, dtype=object))
+    hashed = np.fromiter((_hash(w) for w in uniques), dtype=np.uint64, count=len(uniques))
+    return hashed[codes] if len(codes) else np.empty(0, dtype=np.uint64)
+
+
+def source_version(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:16]
+
+
+class TokenAutomaton:
+    '''
+    Autômato de Aho-Corasick sobre sequências de tokens (não de caracteres),
+    usado para as entradas do léxico com mais de uma palavra.
+    '''
+
+    def __init__(self, patterns):
+        self.goto, self.fail, self.out = [{}], [0], [[]]
+        for tokens, polarity in patterns:
+            state = 0
+            for token in tokens:
+                if token not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][token] = len(self.goto) - 1
+                state = self.goto[state][token]
+            self.out[state].append((len(tokens), polarity))
+        self.first_tokens = set(self.goto[0])
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and token not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(token, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def finditer(self, tokens):
+        state = 0
+        for end, token in enumerate(tokens, 1):
+            while state and token not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(token, 0)
+            for length, polarity in self.out[state]:
+                yield end - length, end, polarity
+
+
+class CompiledLexicon:
+    def __init__(self, hashes, polarity, multiword, source_version=None):
+        self.hashes = hashes
+        self.polarity = polarity
+        self.source_version = source_version
+        self.automaton = TokenAutomaton(multiword) if multiword else None
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def lookup(self, words):
+        # Retorna (polaridades, encontrado) para um array de palavras em minúsculas
+        if len(self.hashes) == 0 or len(words) == 0:
+            return np.zeros(len(words)), np.zeros(len(words), dtype=bool)
+        h = hash_words(words)
+        idx = np.minimum(np.searchsorted(self.hashes, h), len(self.hashes) - 1)
+        found = self.hashes[idx] == h
+        return np.where(found, self.polarity[idx], 0).astype(np.float64), found
+
+    def get(self, word, default=0):
+        values, found = self.lookup([word])
+        return values[0] if found[0] else default
+
+    def _apply_multiword(self, words, values, lengths, lemmas=None):
+        # Só os documentos com algum token inicial de expressão passam pelo autômato
+        streams = [words] if lemmas is None else [words, lemmas]
+        first_tokens = list(self.automaton.first_tokens)
+        candidates = np.logical_or.reduce([np.isin(stream, first_tokens) for stream in streams])
+        if not candidates.any():
+            return values
+        offsets = np.r_[0, np.cumsum(lengths)]
+        docs = np.unique(np.searchsorted(offsets, np.flatnonzero(candidates), side="right") - 1)
+        for d in docs:
+            start, end = offsets[d], offsets[d + 1]
+            taken = np.zeros(end - start, dtype=bool)
+            # As entradas do SentiLex estão no lema ("abrir o coração"): a expressão casa
+            # pela forma do texto ou pela sequência de lemas ("abriu o coração")
+            found = {m for stream in streams for m in self.automaton.finditer(stream[start:end])}
+            matches = sorted(found, key=lambda m: (m[0], m[0] - m[1]))
+            for m_start, m_end, polarity in matches:
+                if taken[m_start:m_end].any():
+                    continue
+                # A expressão conta uma vez, no seu primeiro token
+                taken[m_start:m_end] = True
+                values[start + m_start:start + m_end] = 0.0
+                values[start + m_start] = polarity
+        return values
+
+    '''
+    this function returns the polarity of every token in the stream, trying the
+    surface form, then the lemma, then the multiword expressions (matched on the
+    forms and on the lemmas), in one pass
+    '''
+    def polarities(self, words, lemmas=None, lengths=None):
+        words = np.asarray(words, dtype=object)
+        values, found = self.lookup(words)
+        if lemmas is not None:
+            lemmas = np.asarray(lemmas, dtype=object)
+            missing = np.flatnonzero(~found)
+            lemma_values, _ = self.lookup(lemmas[missing])
+            values[missing] = lemma_values
+        if self.automaton is not None:
+            if lengths is None:
+                lengths = np.array([len(words)])
+            values = self._apply_multiword(words, values, lengths, lemmas)
+        return values
+
+
+def _write_table(source, output):
+    sentilex_df = pd.read_csv(source)
+    words = sentilex_df["Palavra"].astype(str).str.lower().str.strip()
+    polarity = sentilex_df["Polaridade"].astype(np.int8).to_numpy()
+
+    # Em palavras repetidas vale a última ocorrência, como no dict(zip(...)) original
+    table = pd.DataFrame({"hash": hash_words(words), "polarity": polarity}).drop_duplicates("hash", keep="last")
+    table = table.sort_values("hash")
+    np.save(output / "hashes.npy", table["hash"].to_numpy(dtype=np.uint64))
+    np.save(output / "polarity.npy", table["polarity"].to_numpy(dtype=np.int8))
+
+    multiword = [
+        (re.findall(PIECE_PATTERN, w), int(p))
+        for w, p in zip(words, polarity)
+        if len(re.findall(PIECE_PATTERN, w)) > 1
+    ]
+    with open(output / "multiword.json", "w", encoding="utf-8") as f:
+        json.dump(multiword, f, ensure_ascii=False)
+    with open(output / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({"source_version": source_version(source), "entries": len(table)}, f)
+
+
+'''
+this function builds the table in a temporary folder next to the output and only
+then swaps it into place, so a reader never opens a half-written table
+'''
+def compile_lexicon(source=SENTILEX_PATH, output=COMPILED_DIR):
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f"{output.name}.tmp-", dir=output.parent))
+    try:
+        _write_table(source, tmp)
+        if output.exists():
+            # os.replace não sobrescreve uma pasta com arquivos: a antiga sai do caminho
+            # primeiro (os mmaps já abertos continuam válidos) e é apagada depois
+            old = Path(tempfile.mkdtemp(prefix=f"{output.name}.old-", dir=output.parent))
+            os.replace(output, old / output.name)
+            shutil.rmtree(old, ignore_errors=True)
+        os.replace(tmp, output)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return output
+
+
+def compiled_dir(source=SENTILEX_PATH):
+    # Cada léxico tem a sua pasta ao lado do CSV; só o SentiLex padrão usa COMPILED_DIR
+    source = Path(source).resolve()
+    return COMPILED_DIR if source == SENTILEX_PATH else source.with_name(f"{source.stem}_compiled")
+
+
+def is_current(source=SENTILEX_PATH, path=COMPILED_DIR):
+    meta_path = Path(path) / "meta.json"
+    if not meta_path.exists():
+        return False
+    with open(meta_path, encoding="utf-8") as f:
+        return json.load(f)["source_version"] == source_version(source)
+
+
+def ensure_compiled(source=SENTILEX_PATH, path=None):
+    # Recompila só quando a tabela falta ou veio de outro sentilex.csv
+    path = compiled_dir(source) if path is None else path
+    if not is_current(source, path):
+        compile_lexicon(source, path)
+    return Path(path)
+
+
+def open_compiled(path=COMPILED_DIR):
+    # Apenas abre (mmap) uma tabela já compilada; nunca compila
+    path = Path(path)
+    with open(path / "multiword.json", encoding="utf-8") as f:
+        multiword = [(tuple(tokens), polarity) for tokens, polarity in json.load(f)]
+    with open(path / "meta.json", encoding="utf-8") as f:
+        version = json.load(f)["source_version"]
+    return CompiledLexicon(
+        np.load(path / "hashes.npy", mmap_mode="r"),
+        np.load(path / "polarity.npy", mmap_mode="r"),
+        multiword,
+        version,
+    )
+
+
+'''
+this function memory-maps the compiled lexicon, rebuilding it first when it is
+missing or was compiled from a different sentilex.csv
+'''
+def load_compiled(source=SENTILEX_PATH, path=None):
+    return open_compiled(ensure_compiled(source, path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default=str(SENTILEX_PATH))
+    parser.add_argument("--output", help="pasta da tabela (padrão: <léxico>_compiled ao lado do CSV)")
+    args = parser.parse_args()
+    output = compile_lexicon(args.source, args.output or compiled_dir(args.source))
+    lexicon = open_compiled(output)
+    print(f"{len(lexicon)} entradas compiladas em {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+class CorpusIndex:
+    '''
+    Índice do corpus construído uma única vez: vocabulário (token -> id inteiro)
+    e matriz esparsa documento x termo (CSR) com as contagens. As frequências de
+    qualquer recorte (rating, polaridade, amostra) saem de uma soma de colunas
+    sobre as linhas selecionadas, sem recontar listas de tokens em Python.
+    '''
+
+    def __init__(self, vocab, matrix):
+        self.vocab = vocab
+        self.matrix = matrix
+        self.token_ids = {token: i for i, token in enumerate(vocab)}
+
+    @classmethod
+    def build(cls, token_lists):
+        tokens = pd.Series(list(token_lists), dtype=object).explode().dropna()
+        ids, vocab = pd.factorize(tokens, sort=False)
+        rows = tokens.index.to_numpy()
+        matrix = sparse.csr_matrix(
+            (np.ones(len(ids), dtype=np.int32), (rows, ids)),
+            shape=(len(token_lists), len(vocab)),
+        )
+        # Tokens repetidos no mesmo documento viram uma única entrada com a contagem
+        matrix.sum_duplicates()
+        return cls(np.asarray(vocab, dtype=object), matrix)
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def counts(self, mask=None):
+        matrix = self.matrix if mask is None else self.matrix[np.flatnonzero(np.asarray(mask))]
+        return np.asarray(matrix.sum(axis=0)).ravel()
+
+    def _frame(self, ids, counts, columns):
+        return pd.DataFrame({columns[0]: self.vocab[ids], columns[1]: counts[ids]})
+
+    def term_filter(self, min_length=1):
+        lengths = np.fromiter((len(t) for t in self.vocab), dtype=np.int32, count=len(self.vocab))
+        return lengths >= min_length
+
+    '''
+    this function returns the n most frequent tokens of the rows selected by mask
+    '''
+    def most_common(self, n, mask=None, terms=None, columns=("Palavra", "Frequência")):
+        counts = self.counts(mask)
+        if terms is not None:
+            counts = np.where(terms, counts, 0)
+        n = min(n, int(np.count_nonzero(counts)))
+        if n == 0:
+            return self._frame(np.array([], dtype=np.int64), counts, columns)
+        top = np.argpartition(-counts, n - 1)[:n]
+        top = top[np.argsort(-counts[top], kind="stable")]
+        return self._frame(top, counts, columns)
+
+    def least_common(self, n, mask=None, terms=None, columns=("Palavra", "Frequência")):
+        counts = self.counts(mask)
+        present = counts > 0 if terms is None else (counts > 0) & terms
+        ids = np.flatnonzero(present)
+        ids = ids[np.argsort(counts[ids], kind="stable")][:n]
+        return self._frame(ids, counts, columns)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+'''
+Armazenamento colunar (Parquet) dos conjuntos de dados usados pelas páginas.
+
+A ingestão converte uma única vez o b2w (zip ou CSV) e o dataset_all.csv em
+arquivos Parquet tipados e comprimidos; as listas de tokens viram colunas de
+listas nativas e rating/polarity inteiros pequenos. As páginas leem só as
+colunas de que precisam.
+
+O CSV é lido em blocos de --chunk-size linhas (direto do membro do zip, sem
+extrair) e cada bloco é gravado assim que é convertido, então a memória usada
+depende do tamanho do bloco e não do corpus. Com --clean o b2w passa pela
+mesma limpeza do extracting_dataset original (linhas com NaN removidas, sem
+original_index e com a coluna sentiment).
+
+Uso:
+    python interface/dataset_store.py --b2w b2w.csv.zip
+    python interface/dataset_store.py --b2w b2w.csv.zip --clean --output interface/data/b2w_clean.parquet
+    python interface/dataset_store.py --dataset-all interface/models_results/part_1/dataset_all.csv
+'''
+import argparse
+import ast
+import glob
+import os
+import resource
+import time
+import zipfile
+from contextlib import ExitStack
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent
+B2W_CSV = BASE_DIR / "data" / "b2w.csv"
+B2W_STORE = BASE_DIR / "data" / "b2w.parquet"
+DATASET_ALL_CSV = BASE_DIR / "models_results" / "part_1" / "dataset_all.csv"
+DATASET_ALL_STORE = BASE_DIR / "models_results" / "part_1" / "dataset_all.parquet"
+
+CHUNK_SIZE = 100000
+SENTIMENTS = ["negative", "neutral", "positive"]
+
+# Colunas com listas de tokens salvas como texto ("['a', 'b']") nos CSVs
+LIST_COLUMNS = ("review_text_tokenized", "review_text_nostop")
+
+# Tipos inteiros pequenos; "Int8" (nullable) onde o CSV pode ter NaN
+INT_DTYPES = {
+    "original_index": "int32",
+    "rating": "int8",
+    "polarity": "Int8",
+    "kfold_polarity": "Int8",
+    "kfold_rating": "Int8",
+}
+
+
+# Separador entre tokens no repr de uma lista de strings
+TOKEN_SEPARATOR = "', '"
+
+
+'''
+this function parses stringified token lists ("['a', 'b']") with vectorized string
+kernels; only the rare rows that repr() quoted differently go through ast.literal_eval
+'''
+def parse_token_lists(series):
+    text = series.fillna("[]").astype(str).str.strip()
+    # Remove "['" e "']" e separa pelos delimitadores entre tokens
+    tokens = text.str.slice(2, -2).str.split(TOKEN_SEPARATOR, regex=False)
+
+    # Tokens com aspas simples ou barras invertidas usam outra forma de escape no repr
+    special = text.str.contains('"', regex=False) | text.str.contains("\\", regex=False)
+    if special.any():
+        tokens[special] = text[special].map(ast.literal_eval)
+
+    empty = text.str.len() <= 2
+    if empty.any():
+        tokens[empty] = pd.Series([[] for _ in range(int(empty.sum()))], index=text.index[empty])
+    return tokens
+
+
+def _is_stringified(series):
+    first = series.dropna().head(1).tolist()
+    return bool(first) and isinstance(first[0], str)
+
+
+def to_store_types(df):
+    for col, dtype in INT_DTYPES.items():
+        if col in df.columns:
+            df[col] = df[col].astype(dtype)
+    for col in LIST_COLUMNS:
+        if col in df.columns and _is_stringified(df[col]):
+            df[col] = parse_token_lists(df[col])
+    return df
+
+
+def sentiment_labels(rating):
+    rating = np.asarray(rating)
+    return np.select([np.isin(rating, (1, 2)), np.isin(rating, (4, 5))], ["negative", "positive"], "neutral")
+
+
+def write_store(df, dest):
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(dest, engine="pyarrow", compression="zstd", index=False)
+    return dest
+
+
+def iter_csv_chunks(source, chunk_size=CHUNK_SIZE):
+    # Um zip é lido pelo membro .csv, em fluxo, sem extrair para o disco
+    with ExitStack() as stack:
+        handle = source
+        if zipfile.is_zipfile(source):
+            archive = stack.enter_context(zipfile.ZipFile(source))
+            member = next(name for name in archive.namelist() if name.endswith(".csv"))
+            handle = stack.enter_context(archive.open(member))
+        yield from pd.read_csv(handle, chunksize=chunk_size)
+
+
+'''
+this function yields the b2w csv as typed chunks; with clean=True each chunk gets the
+cleaning of the original extracting_dataset (dropna, no original_index, sentiment column)
+'''
+def iter_b2w_chunks(source=None, chunk_size=CHUNK_SIZE, clean=False):
+    if source is None:
+        # Mesmo comportamento de extracting_dataset: procura o .zip na pasta atual
+        zips = glob.glob("*.zip")
+        source = zips[0] if zips else B2W_CSV
+    for chunk in iter_csv_chunks(source, chunk_size):
+        if clean:
+            chunk = chunk.dropna().drop(columns=["original_index"], errors="ignore")
+            chunk["sentiment"] = pd.Categorical(sentiment_labels(chunk["rating"]), categories=SENTIMENTS)
+        yield to_store_types(chunk)
+
+
+def write_chunks(chunks, dest):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    # Grava num arquivo temporário: o store só aparece quando está completo
+    tmp = dest.with_name(f"_{dest.name}.tmp")
+    writer = schema = None
+    try:
+        for chunk in chunks:
+            # O esquema do primeiro bloco vale para todos (ex.: bloco sem nenhum NaN numa coluna Int8)
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                writer = pq.ParquetWriter(tmp, schema, compression="zstd")
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        raise ValueError("CSV sem linhas")
+    os.replace(tmp, dest)
+    return dest
+
+
+def ingest_b2w(source=None, dest=B2W_STORE, chunk_size=CHUNK_SIZE, clean=False):
+    return write_chunks(iter_b2w_chunks(source, chunk_size, clean), dest)
+
+
+def ingest_dataset_all(source=DATASET_ALL_CSV, dest=DATASET_ALL_STORE, chunk_size=CHUNK_SIZE):
+    return write_chunks(map(to_store_types, iter_csv_chunks(source, chunk_size)), dest)
+
+
+def _load(store, ingest, source, columns):
+    # Na primeira execução a ingestão é feita a partir do CSV legado
+    if not Path(store).exists() and Path(source).exists():
+        try:
+            ingest(source, store)
+        except ImportError:
+            # Sem pyarrow: lê o CSV legado direto, convertendo os tokens com o parser vetorizado
+            return to_store_types(pd.read_csv(source, usecols=columns))
+    return pd.read_parquet(store, engine="pyarrow", columns=columns)
+
+
+def store_version(store):
+    # Muda sempre que o arquivo Parquet é regravado; usado como chave de cache
+    path = Path(store)
+    if not path.exists():
+        return "ausente"
+    stat = path.stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def load_b2w(columns=None):
+    return _load(B2W_STORE, ingest_b2w, B2W_CSV, columns)
+
+
+def load_dataset_all(columns=None):
+    return _load(DATASET_ALL_STORE, ingest_dataset_all, DATASET_ALL_CSV, columns)
+
+
+def peak_rss_mb():
+    # ru_maxrss vem em KiB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _report(name, dest, start):
+    import pyarrow.parquet as pq
+    elapsed = time.perf_counter() - start
+    rows = pq.ParquetFile(dest).metadata.num_rows
+    print(f"{name} salvo em {dest}: {rows} linhas em {elapsed:.1f}s "
+          f"({rows / elapsed:.0f} linhas/s, pico de RSS {peak_rss_mb():.0f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--b2w", help="zip ou CSV do b2w")
+    parser.add_argument("--dataset-all", help="CSV gerado em dataset_code.ipynb")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="linhas lidas do CSV por bloco")
+    parser.add_argument("--clean", action="store_true", help="aplica ao b2w a limpeza do extracting_dataset original")
+    parser.add_argument("--output", help="Parquet de saída do b2w (padrão: interface/data/b2w.parquet)")
+    args = parser.parse_args()
+
+    if args.b2w or not args.dataset_all:
+        start = time.perf_counter()
+        dest = ingest_b2w(args.b2w, args.output or B2W_STORE, args.chunk_size, args.clean)
+        _report("b2w", dest, start)
+    if args.dataset_all:
+        start = time.perf_counter()
+        _report("dataset_all", ingest_dataset_all(args.dataset_all, chunk_size=args.chunk_size), start)
+
+
+if __name__ == "__main__":
+    main()
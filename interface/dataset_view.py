@@ -0,0 +1,68 @@
+'''
+Visão imutável do b2w usada pelas páginas de análise exploratória.
+
+As colunas derivadas (lista de tokens, número de tokens, comprimentos e
+sentimento) são calculadas uma única vez por versão do Parquet; as páginas
+guardam o objeto com st.cache_resource e só o leem. O que a visão devolve é
+sempre uma cópia (os valores das células de listas continuam compartilhados),
+então uma alteração feita por quem lê não chega ao dataframe guardado, com ou
+sem o Copy-on-Write do pandas.
+'''
+import dataset_store
+from dataset_store import sentiment_labels
+
+COLUMNS = ["review_text", "review_text_processed", "review_text_tokenized", "polarity", "rating"]
+
+
+'''
+this function adds the derived columns used by the EDA pages (lengths, token counts and sentiment)
+'''
+def derive_columns(df):
+    # Mesmo filtro do extracting_dataset original: linhas com qualquer coluna vazia saem
+    df = df.dropna().reset_index(drop=True)
+    df["polarity"] = df["polarity"].astype("int8")
+    df["review_length"] = df["review_text_processed"].str.split().str.len()
+    df["text_len"] = df["review_text_processed"].str.len()
+    # A coluna já vem do Parquet como lista de tokens
+    df["tokens"] = df["review_text_tokenized"]
+    df["num_tokens"] = df["tokens"].map(len)
+    df["sentiment"] = sentiment_labels(df["rating"])
+    return df
+
+
+class DatasetView:
+    def __init__(self, frame, version):
+        self._frame = frame
+        self.version = version
+
+    @classmethod
+    def from_frame(cls, df, version):
+        return cls(derive_columns(df), version)
+
+    @classmethod
+    def load(cls):
+        return cls.from_frame(dataset_store.load_b2w(columns=COLUMNS), dataset_store.store_version(dataset_store.B2W_STORE))
+
+    def __len__(self):
+        return len(self._frame)
+
+    def __getitem__(self, column):
+        return self._frame[column].copy()
+
+    @property
+    def columns(self):
+        return list(self._frame.columns)
+
+    @property
+    def nbytes(self):
+        # Medido sobre o frame interno, sem a cópia feita por frame()
+        return int(self._frame.memory_usage(index=True).sum())
+
+    def frame(self, columns=None):
+        # No pandas 2.2 o Copy-on-Write vem desligado: uma cópia rasa deixaria o
+        # dataframe do st.cache_resource exposto a df.loc[...] = ...
+        frame = self._frame if columns is None else self._frame[list(columns)]
+        return frame.copy()
+
+    def head(self, n=5):
+        return self._frame.head(n).copy()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+'''
+Agregados da análise exploratória calculados uma única vez por versão do
+dataset e salvos num arquivo JSON pequeno. As páginas (AED.py e a análise
+exploratória do main.py) desenham os gráficos a partir desse resumo e só leem
+linhas do dataset para a tabela de amostra.
+
+Uso:
+    python interface/eda_summary.py
+'''
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+import dataset_store
+from dataset_view import DatasetView
+from chart_reduction import reduce_scatter
+from corpus_index import CorpusIndex
+from ngram_counter import top_ngrams
+
+SUMMARY_PATH = dataset_store.BASE_DIR / "data" / "eda_summary.json"
+SUMMARY_FORMAT = 4
+HIST_BINS = 20
+TOP_WORDS = 15
+TOP_TOKENS = 150
+WORDCLOUD_TERMS = 2000
+FREQUENCY_SAMPLE = 5000
+
+
+def dataset_version(store_version=None):
+    if store_version is None:
+        store_version = dataset_store.store_version(dataset_store.B2W_STORE)
+    return f"{SUMMARY_FORMAT}:{store_version}"
+
+
+def _table(frame):
+    return {"index": [str(i) for i in frame.index], "columns": list(frame.columns), "data": frame.values.tolist()}
+
+
+def to_frame(table):
+    return pd.DataFrame(table["data"], index=table["index"], columns=table["columns"])
+
+
+def _counts(series):
+    counts = series.value_counts().sort_index()
+    return {str(k): int(v) for k, v in counts.items()}
+
+
+def _histogram(values, bins=HIST_BINS):
+    counts, edges = np.histogram(values, bins=bins)
+    return {"edges": edges.tolist(), "counts": counts.tolist()}
+
+
+def _box_stats(df, value, by="rating"):
+    grouped = df.groupby(by)[value]
+    stats = grouped.quantile([0, 0.25, 0.5, 0.75, 1]).unstack()
+    stats.columns = ["min", "q1", "median", "q3", "max"]
+    stats["count"] = grouped.size()
+    return {str(k): {c: float(v) for c, v in row.items()} for k, row in stats.iterrows()}
+
+
+def _words(frame):
+    return frame.values.tolist()
+
+
+'''
+this function computes every EDA aggregate from the dataset view in one pass over the rows
+'''
+def compute_summary(view):
+    df = view.frame()
+    index = CorpusIndex.build(df["tokens"])
+    p95 = float(df["num_tokens"].quantile(0.95))
+    trimmed = df[df["num_tokens"] <= p95]
+
+    info = pd.DataFrame({
+        "Coluna": df.columns,
+        "Tipo de Dado": df.dtypes.astype(str).values,
+        "Não Nulos": df.notnull().sum().values,
+        "Nulos": df.isnull().sum().values,
+        "% Nulos": (df.isnull().mean().values * 100).round(2),
+    })
+
+    # Frequência de palavras (\w+) numa amostra fixa, como na aba "Frequência de Palavras"
+    sample = df["review_text"].astype(str).sample(min(len(df), FREQUENCY_SAMPLE), random_state=0)
+    words = CorpusIndex.build(sample.str.lower().str.findall(r"\b\w+\b"))
+    min3 = words.term_filter(min_length=3)
+
+    by_rating = {
+        str(r): _words(index.most_common(WORDCLOUD_TERMS, mask=(df["rating"] == r).to_numpy()))
+        for r in sorted(df["rating"].unique())
+    }
+
+    sentiment = np.where(df["polarity"] > 0, "Positivo", "Negativo")
+    ngrams = top_ngrams(df["review_text_processed"], sentiment, ns=(1, 2, 3, 4), k=10)
+
+    return {
+        "version": dataset_version(view.version),
+        "n_rows": len(df),
+        "info": _table(info),
+        "describe": _table(df.describe().round(2)),
+        "describe_polarity_rating": _table(df[["polarity", "rating"]].describe().round(2)),
+        "polarity_counts": _counts(df["polarity"]),
+        "rating_counts": _counts(df["rating"]),
+        "sentiment_counts": {str(k): int(v) for k, v in pd.Series(sentiment).value_counts().items()},
+        "review_length_hist": _histogram(df["review_length"].dropna()),
+        "num_tokens_hist_by_rating": {str(r): _histogram(g) for r, g in df.groupby("rating")["num_tokens"]},
+        "num_tokens_counts": _counts(df["num_tokens"]),
+        "correlation": {
+            "all": float(df["rating"].corr(df["num_tokens"])),
+            "p95": float(trimmed["rating"].corr(trimmed["num_tokens"])),
+            "p95_threshold": p95,
+        },
+        # Dispersões reduzidas: comprimento em palavras (análise exploratória) e em caracteres (AED)
+        "length_scatter": {
+            "all": reduce_scatter(df, "num_tokens", "rating", "rating", "num_tokens", ["rating", "num_tokens"]),
+            "p95": reduce_scatter(trimmed, "num_tokens", "rating", "rating", "num_tokens", ["rating", "num_tokens"]),
+        },
+        "text_len_scatter": reduce_scatter(df, "text_len", "rating", "text_len", "rating", ["text_len", "rating", "polarity"]),
+        "box_num_tokens": _box_stats(df, "num_tokens"),
+        "box_num_tokens_p95": _box_stats(trimmed, "num_tokens"),
+        "top_tokens": _words(index.most_common(TOP_TOKENS)),
+        "top_words_by_rating": {r: words[:TOP_WORDS] for r, words in by_rating.items()},
+        # Entradas das nuvens de palavras: tabelas por rating, somadas conforme o intervalo escolhido
+        "word_frequencies_by_rating": by_rating,
+        "top_words_by_polarity": {
+            str(p): _words(index.most_common(TOP_WORDS, mask=(df["polarity"] == p).to_numpy()))
+            for p in sorted(df["polarity"].unique())
+        },
+        "frequency_sample": {
+            "top": _words(words.most_common(20)),
+            "top3": _words(words.most_common(20, terms=min3)),
+            "least3": _words(words.least_common(20, terms=min3)),
+        },
+        "top_ngrams": {f"{n}|{label}": top for (n, label), top in ngrams.items()},
+    }
+
+
+def write_summary(summary, path=SUMMARY_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False)
+
+
+'''
+this function returns the summary for the current dataset version, recomputing and
+rewriting it only when the Parquet store changed (from `view` when given)
+'''
+def load_summary(view=None, path=SUMMARY_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            summary = json.load(f)
+        if summary.get("version") == dataset_version(view.version if view is not None else None):
+            return summary
+    except (OSError, ValueError):
+        pass
+    summary = compute_summary(view if view is not None else DatasetView.load())
+    write_summary(summary, path)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=str(SUMMARY_PATH))
+    args = parser.parse_args()
+    summary = compute_summary(DatasetView.load())
+    write_summary(summary, args.output)
+    print(f"Resumo da versão {summary['version']} ({summary['n_rows']} linhas) salvo em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+'''
+Exporta o BERTimbau ajustado para ONNX (eixos de lote e de sequência
+dinâmicos), opcionalmente com o grafo otimizado offline pelo ONNX Runtime, e
+gera um relatório com:
+- paridade dos logits contra o PyTorch numa fatia separada do b2w
+  (maior/média diferença absoluta e concordância dos rótulos);
+- latência por lote e vazão em CPU dos dois backends nos tamanhos de lote
+  pedidos (1, 8 e 32 por padrão).
+
+O modelo exportado é carregado com PLN_MODEL_PRECISION=onnx (ou
+inference.load_checkpoint(..., "onnx")), com o mesmo predict_sentiment.
+
+Uso (a partir da pasta interface):
+    python export_onnx.py --data data/b2w.csv --optimize
+'''
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from inference import (
+    ONNX_OPTIMIZED, ONNX_WEIGHTS, OnnxSequenceClassifier, checkpoint_path, iter_predictions,
+)
+from quantize_model import load_held_out
+
+MODEL_PATH = "models_results/part_2/final_model_weights"
+REPORT_NAME = "onnx_report.json"
+PARITY_TOLERANCE = 1e-3
+
+
+def export(model, tokenizer, output, opset):
+    sample = tokenizer(["Exemplo de frase para exportação."], return_tensors="pt")
+    # Ordem dos argumentos de BertForSequenceClassification.forward
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+    path = os.path.join(output, ONNX_WEIGHTS)
+    with torch.inference_mode():
+        torch.onnx.export(
+            model, tuple(sample[name] for name in input_names), path,
+            input_names=input_names, output_names=["logits"],
+            dynamic_axes=dynamic_axes, opset_version=opset,
+        )
+    return path
+
+
+def optimize(path, output):
+    # O ONNX Runtime aplica as fusões e grava o grafo resultante; o nível EXTENDED
+    # não depende do hardware em que a otimização foi feita
+    import onnxruntime as ort
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    options.optimized_model_filepath = os.path.join(output, ONNX_OPTIMIZED)
+    ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+    return options.optimized_model_filepath
+
+
+'''
+this function compares the raw logits of both backends on the same padded batches
+'''
+def check_parity(texts, tokenizer, model, onnx_model, batch_size=32):
+    diffs, agree = [], 0
+    with torch.inference_mode():
+        for start in range(0, len(texts), batch_size):
+            inputs = tokenizer(texts[start:start + batch_size], padding=True, truncation=True, max_length=512, return_tensors="pt")
+            expected = model(**inputs).logits.float().numpy()
+            got = onnx_model(**inputs).logits.float().numpy()
+            diffs.append(np.abs(expected - got).ravel())
+            agree += int((expected.argmax(-1) == got.argmax(-1)).sum())
+    diffs = np.concatenate(diffs)
+    return {
+        "max_abs_diff": float(diffs.max()),
+        "mean_abs_diff": float(diffs.mean()),
+        "label_agreement": agree / len(texts),
+        "ok": bool(diffs.max() <= PARITY_TOLERANCE),
+    }
+
+
+def benchmark(texts, tokenizer, model, batch_size):
+    # Uma passada de aquecimento antes de medir
+    list(iter_predictions(texts[:batch_size], tokenizer, model, batch_size=batch_size))
+    start = time.perf_counter()
+    list(iter_predictions(texts, tokenizer, model, batch_size=batch_size))
+    elapsed = time.perf_counter() - start
+    n_batches = -(-len(texts) // batch_size)
+    return {"textos_por_s": len(texts) / elapsed, "ms_por_lote": elapsed / n_batches * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--optimize", action="store_true", help="grava também o grafo otimizado (model_optimized.onnx)")
+    parser.add_argument("--data", default="data/b2w.csv")
+    parser.add_argument("--n", type=int, default=512, help="tamanho da fatia de avaliação")
+    parser.add_argument("--fold", type=int, default=0, help="valor de kfold_polarity usado como fatia separada")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--threads", type=int, default=None, help="threads do ONNX Runtime e do PyTorch")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    output = checkpoint_path(args.model, "onnx")
+    os.makedirs(output, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForSequenceClassification.from_pretrained(args.model).eval()
+
+    # Config e tokenizer ficam ao lado do grafo, como na cópia int8
+    model.config.save_pretrained(output)
+    tokenizer.save_pretrained(output)
+    path = export(model, tokenizer, output, args.opset)
+    print(f"Modelo ONNX salvo em {path}")
+    if args.optimize:
+        path = optimize(path, output)
+        print(f"Grafo otimizado salvo em {path}")
+    onnx_model = OnnxSequenceClassifier(path, num_threads=args.threads)
+
+    texts, _ = load_held_out(args.data, args.n, args.fold, args.seed)
+    report = {
+        "n_textos": len(texts),
+        "fold": args.fold,
+        "opset": args.opset,
+        "otimizado": args.optimize,
+        "paridade_logits": check_parity(texts, tokenizer, model, onnx_model),
+        "desempenho_cpu": {},
+    }
+    for batch_size in args.batch_sizes:
+        torch_stats = benchmark(texts, tokenizer, model, batch_size)
+        onnx_stats = benchmark(texts, tokenizer, onnx_model, batch_size)
+        report["desempenho_cpu"][str(batch_size)] = {
+            "pytorch": torch_stats,
+            "onnx": onnx_stats,
+            "speedup": onnx_stats["textos_por_s"] / torch_stats["textos_por_s"],
+        }
+
+    with open(os.path.join(output, REPORT_NAME), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    parity = report["paridade_logits"]
+    print(f"Paridade dos logits: máx {parity['max_abs_diff']:.2e}, média {parity['mean_abs_diff']:.2e}, "
+          f"rótulos iguais {parity['label_agreement']:.2%} ({'ok' if parity['ok'] else 'acima da tolerância'})")
+    for batch_size, stats in report["desempenho_cpu"].items():
+        print(f"lote {batch_size:>3}: pytorch {stats['pytorch']['textos_por_s']:8.1f} textos/s "
+              f"({stats['pytorch']['ms_por_lote']:.1f} ms/lote) | onnx {stats['onnx']['textos_por_s']:8.1f} textos/s "
+              f"({stats['onnx']['ms_por_lote']:.1f} ms/lote) | speedup {stats['speedup']:.2f}x")
+    if not parity["ok"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
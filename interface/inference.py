@@ -0,0 +1,154 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+
+# torch e transformers são importados dentro das funções: importar este módulo
+# (para checkpoint_path, LABELS etc.) não carrega as bibliotecas do modelo
+
+LABELS = ("NEGATIVA", "POSITIVA")
+
+# Variantes suportadas pelo carregador: "fp32" (pesos originais), "int8" (quantização dinâmica)
+# ou "onnx" (grafo exportado por export_onnx.py, executado no ONNX Runtime)
+PRECISIONS = ("fp32", "int8", "onnx")
+QUANTIZED_SUFFIX = "_int8"
+QUANTIZED_WEIGHTS = "quantized_state_dict.pt"
+ONNX_SUFFIX = "_onnx"
+ONNX_WEIGHTS = "model.onnx"
+ONNX_OPTIMIZED = "model_optimized.onnx"
+
+# Quantidade de textos tokenizados de uma vez antes de ordenar por comprimento
+CHUNK_SIZE = 1024
+
+
+def quantize(model):
+    # Quantização dinâmica: pesos das camadas Linear em int8, ativações em float
+    import torch
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def checkpoint_path(base_path, precision="fp32"):
+    if precision not in PRECISIONS:
+        raise ValueError(f"Precisão inválida '{precision}', use uma de {PRECISIONS}")
+    base_path = str(base_path).rstrip("/")
+    suffix = {"int8": QUANTIZED_SUFFIX, "onnx": ONNX_SUFFIX}.get(precision, "")
+    return base_path + suffix
+
+
+class OnnxSequenceClassifier:
+    '''
+    Executa o classificador exportado para ONNX com a mesma interface usada
+    por iter_predictions: model(**inputs).logits.
+    '''
+
+    def __init__(self, path, num_threads=None):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def eval(self):
+        return self
+
+    def __call__(self, **inputs):
+        import torch
+        feed = {name: np.asarray(inputs[name].cpu(), dtype=np.int64) for name in self.input_names}
+        logits = self.session.run(["logits"], feed)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+'''
+this function loads the tokenizer/model pair in full precision, from the int8 export or from the ONNX export
+'''
+def load_checkpoint(base_path, precision="fp32"):
+    import torch
+    from transformers import AutoConfig, AutoTokenizer, AutoModelForSequenceClassification
+    path = checkpoint_path(base_path, precision)
+    tokenizer = AutoTokenizer.from_pretrained(path)
+    if precision == "onnx":
+        # Usa o grafo otimizado offline quando export_onnx.py --optimize o gerou
+        weights = os.path.join(path, ONNX_OPTIMIZED)
+        if not os.path.exists(weights):
+            weights = os.path.join(path, ONNX_WEIGHTS)
+        model = OnnxSequenceClassifier(weights)
+    elif precision == "int8":
+        # A arquitetura é recriada a partir do config e quantizada antes de receber os pesos int8
+        model = quantize(AutoModelForSequenceClassification.from_config(AutoConfig.from_pretrained(path)))
+        state_dict = torch.load(os.path.join(path, QUANTIZED_WEIGHTS), map_location="cpu", weights_only=False)
+        model.load_state_dict(state_dict)
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(path)
+    return tokenizer, model.eval()
+
+
+def _chunks(texts, size):
+    chunk = []
+    for text in texts:
+        chunk.append(str(text))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _model_device(model):
+    try:
+        return next(model.parameters()).device
+    except (AttributeError, StopIteration):
+        import torch
+        return torch.device("cpu")
+
+
+'''
+this function runs the classifier over an iterable of texts in micro-batches
+and yields (label, probabilities) in the same order as the input
+'''
+def iter_predictions(texts, tokenizer, model, batch_size=32, max_length=512, chunk_size=CHUNK_SIZE):
+    import torch
+    if hasattr(model, "eval"):
+        model.eval()
+    device = _model_device(model)
+
+    for chunk in _chunks(texts, chunk_size):
+        # Tokeniza sem padding para saber o comprimento real de cada texto
+        encoded = tokenizer(chunk, truncation=True, max_length=max_length)
+        keys = list(encoded.keys())
+        lengths = [len(ids) for ids in encoded["input_ids"]]
+
+        # Agrupa textos de comprimento parecido para reduzir o padding
+        order = sorted(range(len(chunk)), key=lengths.__getitem__)
+        probs = [None] * len(chunk)
+
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                batch_idx = order[start:start + batch_size]
+                features = [{k: encoded[k][i] for k in keys} for i in batch_idx]
+                # Padding apenas até o maior texto do bucket (múltiplo de 8)
+                inputs = tokenizer.pad(features, padding=True, pad_to_multiple_of=8, return_tensors="pt")
+                inputs = {k: v.to(device) for k, v in inputs.items()}
+                batch_probs = torch.softmax(model(**inputs).logits.float(), dim=-1).cpu().tolist()
+                for i, p in zip(batch_idx, batch_probs):
+                    probs[i] = p
+
+        for p in probs:
+            yield LABELS[max(range(len(p)), key=p.__getitem__)], p
+
+
+'''
+this function classifies a batch of texts and returns the labels and the class probabilities
+'''
+def predict_batch(texts, tokenizer, model, batch_size=32, max_length=512):
+    labels, probs = [], []
+    for label, p in iter_predictions(texts, tokenizer, model, batch_size=batch_size, max_length=max_length):
+        labels.append(label)
+        probs.append(p)
+    return labels, probs
+
+
+def predict_sentiment(text, tokenizer, model):
+    labels, _ = predict_batch([text], tokenizer, model, batch_size=1)
+    return labels[0]
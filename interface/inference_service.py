@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+'''
+Serviço HTTP (ASGI) de inferência, sem o Streamlit.
+
+Rotas:
+    POST /predict/bert     {"text": "..."} ou {"texts": ["...", ...]}
+    POST /predict/lexicon  idem, score do SentiLex (mesma regra da página PLN Clássica)
+    POST /predict/both     os dois resultados por texto
+    GET  /metrics/latency  histograma de latência por rota
+    GET  /health
+
+Requisições concorrentes são agrupadas em micro-lotes (até MAX_BATCH_SIZE
+textos ou MAX_WAIT_MS de espera) antes de chamar o modelo, o que amortiza o
+forward do transformer sob carga. Quando a fila de um modelo passa de
+MAX_QUEUE textos o serviço responde 503 com Retry-After em vez de acumular
+latência.
+
+Uso (a partir da pasta interface):
+    uvicorn inference_service:app --port 8000
+    python load_test_service.py --url http://127.0.0.1:8000 --concurrency 32
+'''
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import lexicon_scoring
+import model_registry
+from inference import predict_batch
+
+MAX_BATCH_SIZE = int(os.environ.get("PLN_SERVICE_BATCH_SIZE", 32))
+MAX_WAIT_MS = float(os.environ.get("PLN_SERVICE_MAX_WAIT_MS", 10))
+MAX_QUEUE = int(os.environ.get("PLN_SERVICE_MAX_QUEUE", 512))
+MAX_TEXTS_PER_REQUEST = 64
+MAX_BODY_BYTES = 1 << 20
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Overloaded(Exception):
+    pass
+
+
+class MicroBatcher:
+    '''
+    Junta os textos enviados por requisições concorrentes e chama `predict`
+    uma vez por lote, numa thread própria, devolvendo a cada requisição o
+    resultado do seu texto.
+    '''
+
+    def __init__(self, predict, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, max_queue=MAX_QUEUE):
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.pending = 0
+        self.batches = 0
+        self.batched_texts = 0
+        self._queue = None
+        self._worker = None
+        # Uma thread por modelo: os lotes do mesmo modelo não disputam a CPU entre si
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def has_room(self, n):
+        return self.pending + n <= self.max_queue
+
+    def enqueue(self, texts):
+        # Síncrono (sem await): quem verificou has_room antes tem a vaga garantida
+        if not self.has_room(len(texts)):
+            raise Overloaded()
+        loop = asyncio.get_running_loop()
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        futures = [loop.create_future() for _ in texts]
+        self.pending += len(texts)
+        for text, future in zip(texts, futures):
+            self._queue.put_nowait((text, future))
+        return asyncio.gather(*futures)
+
+    async def submit(self, texts):
+        return await self.enqueue(texts)
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            texts = [text for text, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self.predict, texts)
+            except Exception:
+                # Refaz texto a texto para que só o texto problemático receba o erro
+                results = await loop.run_in_executor(self._executor, self._predict_each, texts)
+            self.pending -= len(batch)
+            self.batches += 1
+            self.batched_texts += len(batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _predict_each(self, texts):
+        results = []
+        for text in texts:
+            try:
+                results.append(self.predict([text])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def stats(self):
+        return {
+            "pending": self.pending,
+            "batches": self.batches,
+            "mean_batch_size": round(self.batched_texts / self.batches, 2) if self.batches else None,
+        }
+
+
+class LatencyHistogram:
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+
+    def quantile(self, q):
+        # Limite superior do bucket que contém o quantil
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        labels = [f"<={b}" for b in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            "count": self.total,
+            "mean_ms": round(self.sum_ms / self.total, 2) if self.total else None,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets_ms": dict(zip(labels, self.counts)),
+        }
+
+
+def bert_predict(texts):
+    tokenizer, model = model_registry.get_bert()
+    labels, probs = predict_batch(texts, tokenizer, model, batch_size=len(texts))
+    return [{"label": label, "probabilities": p} for label, p in zip(labels, probs)]
+
+
+def lexicon_predict(texts):
+    scores = lexicon_scoring.score_texts(model_registry.get_spacy(), texts, model_registry.get_lexicon())
+    return [{"label": "Positivo" if s > 0 else "Negativo", "score": float(s)} for s in scores]
+
+
+class InferenceService:
+    def __init__(self, bert=bert_predict, lexicon=lexicon_predict):
+        self.batchers = {"bert": MicroBatcher(bert), "lexicon": MicroBatcher(lexicon)}
+        self.latency = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http":
+            return
+        start = time.perf_counter()
+        status, payload, headers = await self._route(scope, receive)
+        await _send_json(send, status, payload, headers)
+        if scope["path"].startswith("/predict/"):
+            self.latency.setdefault(scope["path"], LatencyHistogram()).observe((time.perf_counter() - start) * 1000)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # PLN_SERVICE_PRELOAD=bert,spacy,sentilex carrega os modelos antes da primeira requisição
+                names = [n for n in os.environ.get("PLN_SERVICE_PRELOAD", "").split(",") if n]
+                model_registry.registry.preload(names)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _route(self, scope, receive):
+        method, path = scope["method"], scope["path"]
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}, []
+        if method == "GET" and path == "/metrics/latency":
+            return 200, {
+                "latency": {route: h.snapshot() for route, h in self.latency.items()},
+                "batching": {name: b.stats() for name, b in self.batchers.items()},
+                "models": model_registry.registry.stats(),
+            }, []
+        if not path.startswith("/predict/"):
+            return 404, {"error": "rota não encontrada"}, []
+        if method != "POST":
+            return 405, {"error": "use POST"}, []
+        target = path[len("/predict/"):]
+        if target not in ("bert", "lexicon", "both"):
+            return 404, {"error": "rota não encontrada"}, []
+
+        try:
+            texts, single = _parse_texts(await _read_body(receive))
+        except ValueError as e:
+            return 400, {"error": str(e)}, []
+        except OverflowError:
+            return 413, {"error": f"corpo maior que {MAX_BODY_BYTES} bytes"}, []
+
+        names = ("bert", "lexicon") if target == "both" else (target,)
+        # Todas as filas são verificadas antes de enfileirar: em /predict/both um 503
+        # não deixa trabalho órfão na fila do outro modelo
+        batchers = [self.batchers[name] for name in names]
+        if not all(b.has_room(len(texts)) for b in batchers):
+            return 503, {"error": "fila cheia, tente novamente"}, [(b"retry-after", b"1")]
+        try:
+            results = await asyncio.gather(*(b.enqueue(texts) for b in batchers))
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}, []
+
+        if target == "both":
+            items = [{"bert": b, "lexicon": lex} for b, lex in zip(*results)]
+        else:
+            items = results[0]
+        return 200, (items[0] if single else {"results": items}), []
+
+
+async def _read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY_BYTES:
+            raise OverflowError()
+        if not message.get("more_body", False):
+            return bytes(body)
+
+
+def _parse_texts(body):
+    try:
+        data = json.loads(body or b"{}")
+    except json.JSONDecodeError:
+        raise ValueError("JSON inválido")
+    if not isinstance(data, dict):
+        raise ValueError('envie {"text": ...} ou {"texts": [...]}')
+    if isinstance(data.get("text"), str):
+        return [data["text"]], True
+    texts = data.get("texts")
+    if not isinstance(texts, list) or not texts or not all(isinstance(t, str) for t in texts):
+        raise ValueError('envie {"text": ...} ou {"texts": [...]}')
+    if len(texts) > MAX_TEXTS_PER_REQUEST:
+        raise ValueError(f"no máximo {MAX_TEXTS_PER_REQUEST} textos por requisição")
+    return texts, False
+
+
+async def _send_json(send, status, payload, headers=()):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json; charset=utf-8"), (b"content-length", str(len(body)).encode())] + list(headers),
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+app = InferenceService()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+'''
+Instrumentação leve dos caminhos críticos das páginas do Streamlit.
+
+Cada execução (rerun) de uma página começa com begin_run("<página>") e
+termina com end_run(). Entre os dois, span("<nome>") e o decorador
+@traced("<nome>") registram a duração de cada etapa (leitura do dataset,
+carga de modelo, spaCy, BERT, montagem e serialização dos gráficos) e o
+tamanho do que ela devolve ou envia ao navegador. Os spans aninhados guardam
+a profundidade, de modo que o tempo de uma aba aparece junto dos gráficos
+que ela contém.
+
+A coleta só fica ativa quando pedida, para não custar nada no uso normal:
+- PLN_DEBUG_TIMINGS=1 (ou ?debug=1 na URL) mostra na barra lateral os tempos
+  da execução atual;
+- PLN_SPANS_FILE=<arquivo.jsonl> acrescenta cada span ao arquivo, uma linha
+  JSON por span, para análise posterior.
+
+Uso:
+    PLN_SPANS_FILE=spans.jsonl streamlit run interface/home.py
+    python interface/instrumentation.py spans.jsonl
+'''
+import argparse
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+DEBUG_ENV = "PLN_DEBUG_TIMINGS"
+SPANS_FILE_ENV = "PLN_SPANS_FILE"
+
+# O Streamlit executa cada sessão numa thread própria: uma execução ativa por thread
+_local = threading.local()
+_file_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ("name", "depth", "start_ms", "duration_ms", "payload", "bytes")
+
+    def __init__(self, name, depth, start_ms, payload=None):
+        self.name = name
+        self.depth = depth
+        self.start_ms = start_ms
+        self.duration_ms = None
+        self.payload = payload
+        self.bytes = None
+
+    def to_dict(self):
+        return {
+            "span": self.name,
+            "depth": self.depth,
+            "start_ms": round(self.start_ms, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            "bytes": self.bytes,
+        }
+
+
+class Run:
+    def __init__(self, page, show_sidebar):
+        self.page = page
+        self.id = uuid.uuid4().hex[:12]
+        self.timestamp = time.time()
+        self.started = time.perf_counter()
+        self.show_sidebar = show_sidebar
+        self.spans = []
+        self.depth = 0
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def _debug_requested():
+    if os.environ.get(DEBUG_ENV):
+        return True
+    try:
+        import streamlit as st
+        return st.query_params.get("debug") == "1"
+    except Exception:
+        return False
+
+
+def begin_run(page):
+    show_sidebar = _debug_requested()
+    _local.run = Run(page, show_sidebar) if show_sidebar or os.environ.get(SPANS_FILE_ENV) else None
+    return _local.run
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+'''
+this function estimates how many bytes a value carries: frames and arrays by their
+buffers, figures by the JSON sent to the browser, summaries by their JSON
+'''
+def payload_size(value):
+    if value is None:
+        return None
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if hasattr(value, "memory_usage"):
+        usage = value.memory_usage(index=True)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    if hasattr(value, "nbytes"):
+        # Arrays e o DatasetView (que mede o frame interno sem copiá-lo)
+        return int(value.nbytes)
+    if hasattr(value, "to_json"):
+        # Figuras do plotly e gráficos do altair
+        return len(value.to_json())
+    if isinstance(value, (dict, list)):
+        try:
+            return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+@contextmanager
+def span(name, payload=None):
+    run = current_run()
+    if run is None:
+        yield None
+        return
+    record = Span(name, run.depth, run.elapsed_ms(), payload)
+    run.depth += 1
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.duration_ms = (time.perf_counter() - start) * 1000
+        run.depth -= 1
+        # O tamanho é medido depois do cronômetro, para não inflar a duração
+        if record.payload is not None:
+            record.bytes = payload_size(record.payload)
+            record.payload = None
+        run.spans.append(record)
+
+
+def traced(name=None, payload=True):
+    def decorator(fn):
+        label = name or getattr(fn, "__qualname__", repr(fn))
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label) as record:
+                result = fn(*args, **kwargs)
+                if payload and record is not None:
+                    record.payload = result
+                return result
+        return wrapper
+    return decorator
+
+
+def chart(name, render, figure, **kwargs):
+    # Serialização do gráfico pelo Streamlit (render) + tamanho do JSON da figura
+    with span(name, payload=figure):
+        return render(figure, **kwargs)
+
+
+def export(run, path):
+    with _file_lock, open(path, "a", encoding="utf-8") as f:
+        for record in run.spans:
+            f.write(json.dumps({"run": run.id, "page": run.page, "timestamp": run.timestamp, **record.to_dict()}, ensure_ascii=False) + "\n")
+
+
+def render_sidebar(run, total_ms):
+    import pandas as pd
+    import streamlit as st
+    rows = [
+        {
+            "Etapa": "· " * record.depth + record.name,
+            "ms": round(record.duration_ms, 1),
+            "KB": None if record.bytes is None else round(record.bytes / 1024, 1),
+        }
+        for record in sorted(run.spans, key=lambda record: record.start_ms)
+    ]
+    with st.sidebar.expander("⏱️ Tempos desta execução", expanded=True):
+        st.caption(f"{run.page}: {total_ms:.0f} ms no total")
+        st.dataframe(pd.DataFrame(rows, columns=["Etapa", "ms", "KB"]), hide_index=True, use_container_width=True)
+
+
+def end_run():
+    run = current_run()
+    if run is None:
+        return None
+    _local.run = None
+    total_ms = run.elapsed_ms()
+    path = os.environ.get(SPANS_FILE_ENV)
+    if path:
+        export(run, path)
+    if run.show_sidebar:
+        render_sidebar(run, total_ms)
+    return run
+
+
+def summarize(path):
+    import pandas as pd
+    spans = pd.read_json(path, lines=True)
+    grouped = spans.groupby(["page", "span"])["duration_ms"]
+    table = pd.DataFrame({
+        "execuções": grouped.size(),
+        "média_ms": grouped.mean(),
+        "p95_ms": grouped.quantile(0.95),
+        "máx_ms": grouped.max(),
+        "KB_médio": spans.groupby(["page", "span"])["bytes"].mean() / 1024,
+    })
+    return table.sort_values("média_ms", ascending=False).round(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", default=os.environ.get(SPANS_FILE_ENV, "spans.jsonl"))
+    args = parser.parse_args()
+    print(summarize(args.path).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+'''
+Pontuação de sentimento baseada no SentiLex, vetorizada sobre o fluxo de
+tokens de vários documentos de uma vez.
+
+As regras são as mesmas da antiga semantic_sentiment das páginas:
+- palavras que aparecem como 'neg' no documento invertem a negação;
+- advérbios ADV com dep advmod/intj somam 1 à intensidade da próxima palavra;
+- a polaridade da palavra é multiplicada pela negação, pela intensidade e por
+  1.5 (amod/advmod) ou 1.2 (nsubj);
+- a negação é desfeita depois de pontuação ou conjunção coordenativa;
+- o total é dividido pelo número de tokens do documento.
+
+Uso (a partir da pasta interface):
+    python lexicon_scoring.py --check-parity 500
+    python lexicon_scoring.py --annotations models_results/part_1/annotations.parquet
+'''
+import argparse
+import time
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+SENTILEX_PATH = "models_results/part_1/sentilex.csv"
+INTENSIFIER_DEPS = ("advmod", "intj")
+RESET_DEPS = ("punct", "cc")
+
+
+def load_sentilex(path=SENTILEX_PATH):
+    sentilex_df = pd.read_csv(path)
+    return dict(zip(sentilex_df["Palavra"].str.lower(), sentilex_df["Polaridade"]))
+
+
+def load_lexicon(path=SENTILEX_PATH):
+    # Léxico compilado (hash ordenado com mmap + expressões multipalavra)
+    import compiled_lexicon
+    return compiled_lexicon.load_compiled(path)
+
+
+def lexicon_polarities(words, lexicon, lemmas=None, lengths=None):
+    if hasattr(lexicon, "polarities"):
+        return lexicon.polarities(words, lemmas, lengths)
+    values = pd.Series(words, dtype=object).map(lexicon)
+    if lemmas is not None:
+        values = values.fillna(pd.Series(lemmas, dtype=object).str.lower().map(lexicon))
+    return values.fillna(0).to_numpy(dtype=np.float64)
+
+
+def _flatten(docs):
+    return np.fromiter(chain.from_iterable(docs), dtype=object)
+
+
+def _segment_offsets(values, starts):
+    # Valor acumulado de `values` antes do início de cada segmento
+    csum = np.cumsum(values)
+    before = csum - values
+    seg = np.cumsum(starts) - 1
+    return csum - before[np.flatnonzero(starts)][seg]
+
+
+'''
+this function scores a batch of pre-parsed documents given as per-document
+sequences of token texts, POS tags and dependency labels (lemmas are optional
+and used as a fallback for words missing from the lexicon)
+'''
+def score_docs(tokens, pos, dep, lexicon, lemmas=None):
+    lengths = np.fromiter((len(doc) for doc in tokens), dtype=np.int64, count=len(tokens))
+    n_docs = len(lengths)
+    if lengths.sum() == 0:
+        return np.zeros(n_docs)
+
+    words = pd.Series(_flatten(tokens), dtype=object).str.lower().to_numpy(dtype=object)
+    pos = _flatten(pos)
+    dep = _flatten(dep)
+    doc_ids = np.repeat(np.arange(n_docs), lengths)
+    first = np.zeros(len(words), dtype=bool)
+    first[np.cumsum(lengths)[lengths > 0] - lengths[lengths > 0]] = True
+
+    # Negadores e intensificadores são definidos pela palavra dentro de cada documento
+    word_ids, _ = pd.factorize(words)
+    keys = doc_ids * (word_ids.max() + 1) + word_ids
+    is_neg = np.isin(keys, keys[dep == "neg"])
+    is_int = ~is_neg & np.isin(keys, keys[(pos == "ADV") & np.isin(dep, INTENSIFIER_DEPS)])
+    regular = ~is_neg & ~is_int
+
+    # Negação: paridade dos negadores desde o início do documento ou do último punct/cc pontuado
+    resets = regular & np.isin(dep, RESET_DEPS)
+    neg_starts = first | np.r_[False, resets[:-1]]
+    negated = _segment_offsets(is_neg.astype(np.int64), neg_starts) % 2 == 1
+
+    # Intensidade: 1 + intensificadores desde a última palavra pontuada do documento
+    int_starts = first | np.r_[False, regular[:-1]]
+    intensity = 1.0 + _segment_offsets(is_int.astype(np.int64), int_starts)
+
+    weight = np.where(np.isin(dep, ("amod", "advmod")), 1.5, np.where(dep == "nsubj", 1.2, 1.0))
+    if lemmas is not None:
+        lemmas = pd.Series(_flatten(lemmas), dtype=object).str.lower().to_numpy(dtype=object)
+    polarities = lexicon_polarities(words, lexicon, lemmas, lengths)
+    contribution = polarities * np.where(negated, -1.0, 1.0) * intensity * weight
+    contribution[~regular] = 0.0
+
+    totals = np.bincount(doc_ids, weights=contribution, minlength=n_docs)
+    return totals / np.maximum(lengths, 1)
+
+
+def score_doc(doc, lexicon, use_lemmas=True):
+    lemmas = [[t.lemma_ for t in doc]] if use_lemmas else None
+    return float(score_docs([[t.text for t in doc]], [[t.pos_ for t in doc]], [[t.dep_ for t in doc]], lexicon, lemmas)[0])
+
+
+def score_texts(nlp, texts, lexicon, batch_size=256):
+    # Anota os textos em lote (nlp.pipe) e pontua todos de uma vez
+    docs = list(nlp.pipe(texts, batch_size=batch_size))
+    return score_docs(
+        [[t.text for t in d] for d in docs], [[t.pos_ for t in d] for d in docs],
+        [[t.dep_ for t in d] for d in docs], lexicon, [[t.lemma_ for t in d] for d in docs],
+    )
+
+
+def reference_score(doc, lexicon):
+    # Implementação original (laço em Python), usada apenas na verificação de paridade
+    intensifiers = [t.text.lower() for t in doc if t.pos_ == "ADV" and t.dep_ in ("advmod", "intj")]
+    negators = [t.text.lower() for t in doc if t.dep_ == 'neg']
+    score, negation, intensity = 0, False, 1.0
+    for token in doc:
+        word = token.text.lower()
+        if word in negators:
+            negation = not negation
+            continue
+        if word in intensifiers:
+            intensity += 1
+            continue
+        pol = lexicon.get(word, 0)
+        if negation: pol *= -1
+        pol *= intensity
+        if token.dep_ in ("amod", "advmod"):
+            pol *= 1.5
+        elif token.dep_ == "nsubj":
+            pol *= 1.2
+        score += pol
+        intensity = 1.0
+        if token.dep_ in ("punct", "cc"): negation = False
+    return score / max(1, len(doc))
+
+
+def check_parity(nlp, texts, lexicon):
+    docs = list(nlp.pipe(texts))
+    expected = np.array([reference_score(doc, lexicon) for doc in docs])
+    got = score_docs([[t.text for t in d] for d in docs], [[t.pos_ for t in d] for d in docs],
+                     [[t.dep_ for t in d] for d in docs], lexicon)
+    mismatches = np.flatnonzero(~np.isclose(expected, got))
+    return len(docs), mismatches, expected, got
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentilex", default=SENTILEX_PATH)
+    parser.add_argument("--check-parity", type=int, metavar="N", help="compara com a implementação original em N reviews")
+    parser.add_argument("--annotations", help="Parquet gerado por annotate_corpus.py")
+    parser.add_argument("--column", default="review_text", help="coluna de texto anotada")
+    parser.add_argument("--output", help="Parquet de saída com os scores")
+    args = parser.parse_args()
+
+    lexicon = load_sentilex(args.sentilex)
+
+    if args.check_parity:
+        import spacy
+        import dataset_store
+        texts = dataset_store.load_dataset_all(columns=["review_text"])["review_text"].dropna().astype(str)
+        texts = texts.sample(min(args.check_parity, len(texts)), random_state=0).tolist()
+        n, mismatches, expected, got = check_parity(spacy.load("pt_core_news_sm"), texts, lexicon)
+        print(f"Paridade: {n - len(mismatches)}/{n} documentos idênticos")
+        for i in mismatches[:10]:
+            print(f"  {expected[i]:.4f} != {got[i]:.4f}: {texts[i][:80]}")
+
+    if args.annotations:
+        import pyarrow.parquet as pq
+        cols = [f"{args.column}_tokens", f"{args.column}_pos", f"{args.column}_dep"]
+        table = pq.read_table(args.annotations, columns=["doc_id"] + cols).to_pandas()
+        start = time.perf_counter()
+        scores = score_docs(table[cols[0]], table[cols[1]], table[cols[2]], load_lexicon(args.sentilex))
+        elapsed = time.perf_counter() - start
+        print(f"{len(scores)} documentos pontuados em {elapsed:.2f}s ({len(scores) / elapsed:.0f} docs/s)")
+        if args.output:
+            pd.DataFrame({"doc_id": table["doc_id"], "score": scores}).to_parquet(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+'''
+Teste de carga local do inference_service.py: dispara N requisições com C
+conexões concorrentes (HTTP/1.1 com keep-alive, só biblioteca padrão) usando
+as frases do jogo e mostra vazão, latência e códigos de resposta. No fim
+imprime o que o próprio serviço mediu em /metrics/latency.
+
+Uso (a partir da pasta interface, com o serviço rodando):
+    python load_test_service.py --route /predict/bert --requests 2000 --concurrency 32
+'''
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from phrase_pool import load_phrases
+
+
+class Connection:
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        head = (
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        )
+        self.writer.write(head.encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        status = int(status_line.split()[1])
+        length, close = 0, False
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+            elif name.lower() == "connection" and value.strip().lower() == "close":
+                close = True
+        data = await self.reader.readexactly(length)
+        if close:
+            self.close()
+        return status, data
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+async def run(url, route, n_requests, concurrency, texts_per_request, phrases):
+    parts = urlsplit(url)
+    queue = asyncio.Queue()
+    for _ in range(n_requests):
+        queue.put_nowait(random.sample(phrases, texts_per_request))
+    latencies, statuses = [], Counter()
+
+    async def worker():
+        conn = Connection(parts.hostname, parts.port or 80)
+        try:
+            while not queue.empty():
+                texts = queue.get_nowait()
+                payload = {"text": texts[0]} if len(texts) == 1 else {"texts": texts}
+                start = time.perf_counter()
+                try:
+                    status, _ = await conn.request("POST", route, payload)
+                except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                    status = "erro"
+                    conn.close()
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[status] += 1
+        finally:
+            conn.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    conn = Connection(parts.hostname, parts.port or 80)
+    _, metrics = await conn.request("GET", "/metrics/latency")
+    conn.close()
+    return elapsed, np.array(latencies), statuses, json.loads(metrics)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--route", default="/predict/bert", choices=["/predict/bert", "/predict/lexicon", "/predict/both"])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--texts-per-request", type=int, default=1)
+    args = parser.parse_args()
+
+    phrases = load_phrases()
+    elapsed, latencies, statuses, metrics = asyncio.run(
+        run(args.url, args.route, args.requests, args.concurrency, args.texts_per_request, phrases)
+    )
+    n_texts = statuses.get(200, 0) * args.texts_per_request
+    print(f"{args.requests} requisições em {elapsed:.2f}s ({args.requests / elapsed:.1f} req/s, {n_texts / elapsed:.1f} textos/s)")
+    print("Latência (ms): p50 {:.1f} | p95 {:.1f} | p99 {:.1f} | máx {:.1f}".format(*np.percentile(latencies, [50, 95, 99, 100])))
+    print(f"Respostas: {dict(statuses)}")
+    print(json.dumps(metrics, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
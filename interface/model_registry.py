@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+'''
+Registro dos recursos pesados compartilhados pelas páginas: o pipeline do
+spaCy, o par tokenizer/modelo do BERTimbau e o léxico SentiLex compilado.
+
+Cada recurso é um singleton por processo do servidor: é carregado (e
+aquecido com uma chamada de teste) na primeira vez que alguma página pede,
+e as outras páginas e sessões reutilizam a mesma instância. O registro
+informa o tempo de carga e a memória de cada recurso e, com
+PLN_RESOURCE_TTL=<segundos>, descarrega os recursos ociosos há mais tempo
+que isso para liberar RAM em máquinas pequenas.
+
+Uso (a partir da pasta interface):
+    python model_registry.py spacy sentilex bert
+'''
+import argparse
+import gc
+import os
+import sys
+import threading
+import time
+
+import dataset_store
+import inference
+import lexicon_scoring
+
+SPACY_MODEL = "pt_core_news_sm"
+MODEL_PATH = dataset_store.BASE_DIR / "models_results" / "part_2" / "final_model_weights"
+SENTILEX_PATH = dataset_store.BASE_DIR / "models_results" / "part_1" / "sentilex.csv"
+# "int8" usa a cópia quantizada gerada por quantize_model.py
+MODEL_PRECISION = os.environ.get("PLN_MODEL_PRECISION", "fp32")
+TTL_ENV = "PLN_RESOURCE_TTL"
+WARMUP_TEXT = "O produto chegou rápido e funciona muito bem."
+
+
+def _rss_bytes():
+    # Memória residente do processo (Linux); None quando /proc não está disponível
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def estimate_size(value):
+    # Tamanho dos tensores/arrays quando o tipo do recurso permite medir diretamente
+    if isinstance(value, tuple):
+        sizes = [estimate_size(v) for v in value]
+        return sum(s for s in sizes if s is not None) if any(s is not None for s in sizes) else None
+    if hasattr(value, "parameters") and hasattr(value, "buffers"):
+        tensors = list(value.parameters()) + list(value.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if hasattr(value, "hashes") and hasattr(value, "polarity"):
+        return int(value.hashes.nbytes + value.polarity.nbytes)
+    return None
+
+
+class Resource:
+    def __init__(self, name, loader, warmup=None):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.value = None
+        self.loaded = False
+        self.load_seconds = None
+        self.rss_delta = None
+        self.size = None
+        self.last_used = None
+        self.on_unload = []
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._resources = {}
+        self._lock = threading.Lock()
+        self._janitor = None
+
+    def register(self, name, loader, warmup=None):
+        with self._lock:
+            self._resources[name] = Resource(name, loader, warmup)
+
+    def on_unload(self, name, callback):
+        # Chamado quando o recurso é descarregado, para quem guarda objetos derivados dele
+        self._resources[name].on_unload.append(callback)
+
+    def _load(self, resource, profile=None):
+        gc.collect()
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        if profile is not None:
+            with profile.span(resource.name):
+                value = resource.loader()
+        else:
+            value = resource.loader()
+        if resource.warmup is not None:
+            resource.warmup(value)
+        resource.load_seconds = time.perf_counter() - start
+        rss_after = _rss_bytes()
+        resource.rss_delta = None if rss_before is None or rss_after is None else max(rss_after - rss_before, 0)
+        resource.size = estimate_size(value)
+        resource.value = value
+        resource.loaded = True
+
+    '''
+    this function returns the resource, loading and warming it up on first use;
+    concurrent callers wait for the same load instead of loading twice
+    '''
+    def get(self, name, profile=None):
+        self.evict_idle()
+        resource = self._resources[name]
+        with resource.lock:
+            if not resource.loaded:
+                self._load(resource, profile)
+            resource.last_used = time.monotonic()
+            return resource.value
+
+    def unload(self, name):
+        resource = self._resources[name]
+        with resource.lock:
+            if not resource.loaded:
+                return False
+            resource.value = None
+            resource.loaded = False
+        for callback in resource.on_unload:
+            callback()
+        gc.collect()
+        if "torch" in sys.modules:
+            torch = sys.modules["torch"]
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        return True
+
+    def evict_idle(self, now=None):
+        if not self.ttl:
+            return []
+        now = time.monotonic() if now is None else now
+        idle = [
+            name for name, r in self._resources.items()
+            if r.loaded and r.last_used is not None and now - r.last_used > self.ttl
+        ]
+        return [name for name in idle if self.unload(name)]
+
+    def start_janitor(self, interval=None):
+        # Thread em segundo plano que descarrega recursos ociosos mesmo sem novas requisições
+        if not self.ttl or self._janitor is not None:
+            return
+        interval = interval or max(self.ttl / 2, 1)
+
+        def run():
+            while True:
+                time.sleep(interval)
+                self.evict_idle()
+
+        self._janitor = threading.Thread(target=run, name="model-registry-janitor", daemon=True)
+        self._janitor.start()
+
+    def preload(self, names, background=True):
+        def run():
+            for name in names:
+                self.get(name)
+        if not background:
+            return run()
+        threading.Thread(target=run, name="model-registry-preload", daemon=True).start()
+
+    def stats(self):
+        now = time.monotonic()
+        return [
+            {
+                "name": r.name,
+                "loaded": r.loaded,
+                "load_s": None if r.load_seconds is None else round(r.load_seconds, 3),
+                "memory_mb": None if r.size is None else round(r.size / 2**20, 1),
+                "rss_delta_mb": None if r.rss_delta is None else round(r.rss_delta / 2**20, 1),
+                "idle_s": None if r.last_used is None else round(now - r.last_used, 1),
+            }
+            for r in self._resources.values()
+        ]
+
+
+def _load_spacy():
+    import spacy
+    return spacy.load(SPACY_MODEL)
+
+
+def _load_bert():
+    path = inference.checkpoint_path(MODEL_PATH, MODEL_PRECISION)
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"Diretório do modelo não encontrado em '{path}'.")
+    return inference.load_checkpoint(MODEL_PATH, MODEL_PRECISION)
+
+
+def _ttl_from_env():
+    value = os.environ.get(TTL_ENV)
+    return float(value) if value else None
+
+
+registry = ModelRegistry(ttl=_ttl_from_env())
+registry.register("spacy", _load_spacy, warmup=lambda nlp: nlp(WARMUP_TEXT))
+registry.register("bert", _load_bert, warmup=lambda pair: inference.predict_sentiment(WARMUP_TEXT, *pair))
+registry.register("sentilex", lambda: lexicon_scoring.load_lexicon(SENTILEX_PATH))
+registry.start_janitor()
+
+
+def get_spacy(profile=None):
+    return registry.get("spacy", profile)
+
+
+def get_bert(profile=None):
+    return registry.get("bert", profile)
+
+
+def get_lexicon(profile=None):
+    return registry.get("sentilex", profile)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", default=["spacy", "sentilex", "bert"])
+    args = parser.parse_args()
+    for name in args.names:
+        try:
+            registry.get(name)
+        except Exception as e:
+            print(f"{name}: erro ao carregar ({e})")
+    for row in registry.stats():
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+# Palavras com 3+ caracteres e ao menos uma letra (mesmo filtro do antigo has_letters_and_length)
+TOKEN_PATTERN = r"\b\w{3,}\b"
+LETTER_PATTERN = r"[a-zA-Z]"
+
+
+class SpaceSaving:
+    '''
+    Resumo Space-Saving limitado a `capacity` contadores, indexado pelo hash do
+    n-grama. Cada bloco do corpus é contado de forma exata e mesclado ao resumo
+    (merge de Space-Saving: chaves ausentes herdam o menor contador do outro
+    lado) e só os `capacity` maiores sobrevivem, então a memória não cresce com
+    o corpus e os heavy hitters não são perdidos.
+    '''
+
+    def __init__(self, capacity=5000):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype="int64", index=pd.Index([], dtype="int64"))
+        self.labels = {}
+
+    def _floor(self):
+        return int(self.counts.min()) if len(self.counts) >= self.capacity else 0
+
+    def update(self, chunk_counts, labels):
+        if not chunk_counts:
+            return
+        chunk = pd.Series(
+            np.fromiter(chunk_counts.values(), dtype=np.int64, count=len(chunk_counts)),
+            index=np.fromiter(chunk_counts.keys(), dtype=np.int64, count=len(chunk_counts)),
+        )
+        keys = self.counts.index.union(chunk.index)
+        merged = self.counts.reindex(keys, fill_value=self._floor()) + chunk.reindex(keys, fill_value=0)
+        self.counts = merged.nlargest(self.capacity)
+        self.labels.update(labels)
+        self.labels = {key: self.labels[key] for key in self.counts.index}
+
+    def top(self, k):
+        return [(self.labels[key], int(count)) for key, count in self.counts.nlargest(k).items()]
+
+
+_has_letter = re.compile(LETTER_PATTERN).search
+
+
+def tokenize(texts):
+    # Texto ausente vira "" (sem tokens) tanto no pandas 2 quanto no 3
+    tokens = texts.fillna("").astype(str).str.lower().str.findall(TOKEN_PATTERN)
+    return tokens.map(lambda words: [w for w in words if _has_letter(w)])
+
+
+def _count_chunk(token_lists, n):
+    counts, labels = Counter(), {}
+    for words in token_lists:
+        # Gera os n-gramas de cada documento sem materializar a lista completa
+        for gram in zip(*(words[i:] for i in range(n))):
+            key = hash(gram)
+            counts[key] += 1
+            if key not in labels:
+                labels[key] = " ".join(gram)
+    return counts, labels
+
+
+'''
+this function streams the corpus in chunks and returns the top-k n-grams for every
+(n, group) pair, where groups are the distinct values of `groups`
+'''
+def top_ngrams(texts, groups, ns=(1, 2, 3, 4), k=10, capacity=5000, chunk_size=5000):
+    texts = texts.reset_index(drop=True)
+    groups = pd.Series(groups).reset_index(drop=True)
+    summaries = {(n, g): SpaceSaving(capacity) for n in ns for g in groups.dropna().unique()}
+
+    for start in range(0, len(texts), chunk_size):
+        chunk_tokens = tokenize(texts.iloc[start:start + chunk_size])
+        chunk_groups = groups.iloc[start:start + chunk_size]
+        for group in chunk_groups.dropna().unique():
+            token_lists = chunk_tokens[chunk_groups == group]
+            for n in ns:
+                summaries[(n, group)].update(*_count_chunk(token_lists, n))
+
+    return {key: summary.top(k) for key, summary in summaries.items()}
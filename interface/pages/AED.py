@@ -1,17 +1,20 @@
+import startup_profile
+profile = startup_profile.get_profile("AED")
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import plotly.express as px
-import seaborn as sns
+import plotly.graph_objects as go
 import io
-import ast
-import re
-import nltk
-from nltk import ngrams
-from nltk.tokenize import word_tokenize
-from collections import Counter
-from wordcloud import WordCloud
+
+import dataset_store
+import eda_summary
+import instrumentation
+from dataset_view import DatasetView
+import wordclouds
+
+instrumentation.begin_run("AED")
 
 # === Configurações de Página ===
 st.set_page_config(page_title="Análise Exploratória", layout="wide", page_icon=":books:")
@@ -19,27 +22,30 @@ st.markdown("<h1 style='text-align: center; color: #264653;'>Análise Explorató
 st.divider()
 
 # === Funções ===
-@st.cache_data(show_spinner=False)
-def load_dataframe():
-    df = pd.read_csv("data/b2w.csv")
-    df = df.dropna(subset=["polarity"]).reset_index(drop=True)
-    # Seleção de Colunas
-    if "review_text_processed" in df.columns:
-        df["review_length"] = df["review_text_processed"].str.split().apply(len)
-        df["text_len"] = df["review_text_processed"].str.len()
-    else:
-        df["review_length"] = np.nan
-        df["text_len"] = np.nan
-    
-    if "review_text_tokenized" in df.columns:
-        df["tokens"] = df["review_text_tokenized"].apply(lambda x: ast.literal_eval(x) if pd.notnull(x) else [])
-        df["num_tokens"] = df["tokens"].apply(len)
-    else:
-        df["tokens"] = None
-        df["num_tokens"] = np.nan
-    return df
-
-df = load_dataframe()
+# Visão imutável do dataset (colunas derivadas calculadas uma vez por versão do Parquet)
+@instrumentation.traced("AED.load_dataset")
+@st.cache_resource(show_spinner=False)
+def load_dataset(version):
+    with profile.span("dataset"):
+        return DatasetView.load()
+
+dataset = load_dataset(dataset_store.store_version(dataset_store.B2W_STORE))
+
+# Agregados calculados uma vez por versão do dataset (eda_summary.py)
+@instrumentation.traced("AED.load_summary")
+@st.cache_data(show_spinner="Calculando o resumo do dataset...")
+def load_summary(version, _dataset=None):
+    with profile.span("resumo da AED"):
+        return eda_summary.load_summary(_dataset)
+
+summary = load_summary(eda_summary.dataset_version(dataset.version), dataset)
+
+def words_frame(words):
+    return pd.DataFrame(words, columns=['Palavra', 'Frequência'])
+
+def histogram_frame(hist):
+    edges = np.asarray(hist['edges'])
+    return pd.DataFrame({'centro': (edges[:-1] + edges[1:]) / 2, 'largura': np.diff(edges), 'Frequência': hist['counts']})
 
 # === TABS ===
 tabs = st.tabs([
@@ -52,41 +58,33 @@ tabs = st.tabs([
 ])
 
 # === Base de Dados ===
-with tabs[0]:
+with tabs[0], instrumentation.span("aba: Base de Dados"):
     st.subheader("Visualização da Base")
-    st.dataframe(df.head(500), use_container_width=True)
+    st.dataframe(dataset.head(500), use_container_width=True)
     st.divider()
 
     st.subheader("Informações da Tabela")
-    info_df = pd.DataFrame({
-        "Coluna": df.columns,
-        "Tipo de Dado": df.dtypes.values,
-        "Não Nulos": df.notnull().sum().values,
-        "Nulos": df.isnull().sum().values,
-        "% Nulos": (df.isnull().mean().values * 100).round(2)
-    })
-    st.dataframe(info_df, use_container_width=True)
+    st.dataframe(eda_summary.to_frame(summary["info"]).reset_index(drop=True), use_container_width=True)
 
 # === Estatísticas Gerais ===
-with tabs[1]:
+with tabs[1], instrumentation.span("aba: Estatísticas Gerais"):
     st.subheader("Estatísticas Descritivas")
-    st.dataframe(df.describe().round(2), use_container_width=True)
+    st.dataframe(eda_summary.to_frame(summary["describe"]), use_container_width=True)
     st.divider()
 
     st.subheader("Polarity e Rating")
-    st.dataframe(df[['polarity', 'rating']].describe().round(2), use_container_width=True)
+    st.dataframe(eda_summary.to_frame(summary["describe_polarity_rating"]), use_container_width=True)
     st.divider()
 
     st.subheader("Distribuição de Polaridade")
-    pol_df = df['polarity'].value_counts().sort_index().reset_index()
-    pol_df.columns = ['Polaridade', 'Frequência']
+    pol_df = pd.DataFrame([(int(k), v) for k, v in summary["polarity_counts"].items()], columns=['Polaridade', 'Frequência'])
     fig = px.bar(pol_df, x='Polaridade', y='Frequência', text='Frequência', color_discrete_sequence=['#7C3AED'])
     fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', showlegend=False)
-    st.plotly_chart(fig, use_container_width=True)
+    instrumentation.chart("gráfico: Distribuição de Polaridade", st.plotly_chart, fig, use_container_width=True)
     st.divider()
 
     st.subheader("Distribuição de Notas")
-    rating_counts = df['rating'].value_counts().sort_index()
+    rating_counts = pd.Series({int(k): v for k, v in summary["rating_counts"].items()})
     rating_percent = (rating_counts / rating_counts.sum() * 100).round(1)
     rating_df = pd.DataFrame({
         'Rating': rating_counts.index,
@@ -95,151 +93,142 @@ with tabs[1]:
     })
     fig = px.bar(rating_df, x='Rating', y='Contagem', text='Porcentagem (%)', color_discrete_sequence=['#FFA24D'])
     fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', showlegend=False)
-    st.plotly_chart(fig, use_container_width=True)
+    instrumentation.chart("gráfico: Distribuição de Notas", st.plotly_chart, fig, use_container_width=True)
     st.divider()
 
-    if "review_length" in df.columns and df["review_length"].notnull().any():
+    if sum(summary["review_length_hist"]["counts"]):
         st.subheader("Distribuição de Tokens por Comentário")
-        fig = px.histogram(df, x='review_length', nbins=20, labels={'review_length': 'Número de Tokens'}, color_discrete_sequence=['#2596FF'])
-        fig.update_layout(plot_bgcolor='rgba(0,0,0,0)')
-        st.plotly_chart(fig, use_container_width=True)
+        hist_df = histogram_frame(summary["review_length_hist"])
+        fig = px.bar(hist_df, x='centro', y='Frequência', labels={'centro': 'Número de Tokens'}, color_discrete_sequence=['#2596FF'])
+        fig.update_traces(width=hist_df['largura'])
+        fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', bargap=0)
+        instrumentation.chart("gráfico: Distribuição de Tokens por Comentário", st.plotly_chart, fig, use_container_width=True)
 
 # === Frequência de Palavras ===
-with tabs[2]:
+with tabs[2], instrumentation.span("aba: Frequência de Palavras"):
     st.subheader("Palavras mais Frequentes")
-    sample_text = " ".join(df['review_text'].astype(str).sample(min(len(df), 5000), random_state=0)).lower()
-    tokens = re.findall(r'\b\w+\b', sample_text)
-    top_words = Counter(tokens).most_common(20)
-    top_df = pd.DataFrame(top_words, columns=['Palavra', 'Frequência'])
+    frequency = summary["frequency_sample"]
+    top_df = words_frame(frequency["top"])
 
     fig = px.bar(top_df, x='Palavra', y='Frequência', text='Frequência', color_discrete_sequence=['#5B6DCD'])
     fig.update_layout(plot_bgcolor='rgba(0,0,0,0)')
-    st.plotly_chart(fig, use_container_width=True)
+    instrumentation.chart("gráfico: Palavras mais Frequentes", st.plotly_chart, fig, use_container_width=True)
     st.divider()
 
     st.subheader("Palavras mais Frequentes (com 3+ caracteres)")
-    tokens3 = re.findall(r'\b\w{3,}\b', sample_text)
-    top_df = pd.DataFrame(Counter(tokens3).most_common(20), columns=['Palavra', 'Frequência'])
+    top_df = words_frame(frequency["top3"])
     fig = px.bar(top_df, x='Palavra', y='Frequência', text='Frequência', color_discrete_sequence=['#FFB86B'])
     fig.update_layout(plot_bgcolor='rgba(0,0,0,0)')
-    st.plotly_chart(fig, use_container_width=True)
+    instrumentation.chart("gráfico: Palavras mais Frequentes (com 3+ caracteres)", st.plotly_chart, fig, use_container_width=True)
     st.divider()
 
     st.subheader("Palavras Menos Frequentes")
-    least_common = sorted(Counter(tokens3).items(), key=lambda x: x[1])[:20]
-    st.dataframe(pd.DataFrame(least_common, columns=["Palavra", "Frequência"]), use_container_width=True)
+    st.dataframe(words_frame(frequency["least3"]), use_container_width=True)
 
 # === Wordcloud ===
-with tabs[3]:
+with tabs[3], instrumentation.span("aba: Wordcloud"):
     st.subheader("Nuvens de Palavras por Sentimento")
 
-    def generate_wordcloud(text):
-        wc = WordCloud(width=800, height=400, background_color='white').generate(text)
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.imshow(wc, interpolation='bilinear')
-        ax.axis("off")
-        return fig
-
-    # Seleção de amostra
-    n_wc = 4000
-    pos_reviews = df[df['rating'] >= 4]['review_text_processed'].dropna().astype(str)
-    neg_reviews = df[df['rating'] <= 2]['review_text_processed'].dropna().astype(str)
+    # Imagens geradas a partir das frequências por rating do resumo, em cache por (ratings, paleta, max_words)
+    @instrumentation.traced("AED.wordcloud_png")
+    @st.cache_data(show_spinner=False)
+    def wordcloud_png(version, ratings, colormap, max_words=200):
+        tables = load_summary(version)["word_frequencies_by_rating"]
+        return wordclouds.render_png(wordclouds.merge_frequencies(tables, ratings), colormap, max_words)
 
     col1, col2 = st.columns(2)
-    with col1:
-        st.markdown("##### Reviews Positivas")
-        st.pyplot(generate_wordcloud(" ".join(pos_reviews.sample(min(n_wc, len(pos_reviews)), random_state=1))))
-    with col2:
-        st.markdown("##### Reviews Negativas")
-        st.pyplot(generate_wordcloud(" ".join(neg_reviews.sample(min(n_wc, len(neg_reviews)), random_state=1))))
+    for col, title, ratings in ((col1, "Reviews Positivas", (4, 5)), (col2, "Reviews Negativas", (1, 2))):
+        with col:
+            st.markdown(f"##### {title}")
+            png = wordcloud_png(summary["version"], ratings, 'viridis')
+            if png:
+                st.image(png, use_container_width=True)
 
 # === Rating/Polaridade ===
-with tabs[4]:
+with tabs[4], instrumentation.span("aba: Rating/Polaridade"):
     st.subheader("Distribuição de Tokens por Rating")
-    if "tokens" in df.columns and "num_tokens" in df.columns:
-        fig = px.box(df, x='rating', y='num_tokens', color='rating', points="all", color_discrete_sequence=px.colors.sequential.Viridis)
-        fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
-        st.divider()
+    # Caixas desenhadas a partir dos quantis pré-calculados, sem enviar as linhas ao navegador
+    fig = go.Figure()
+    for idx, (rating, box) in enumerate(sorted(summary["box_num_tokens"].items(), key=lambda item: int(item[0]))):
+        fig.add_trace(go.Box(
+            x=[rating], q1=[box['q1']], median=[box['median']], q3=[box['q3']],
+            lowerfence=[box['min']], upperfence=[box['max']], name=rating,
+            marker_color=px.colors.sequential.Viridis[idx % len(px.colors.sequential.Viridis)]
+        ))
+    fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', showlegend=False, xaxis_title='rating', yaxis_title='num_tokens')
+    instrumentation.chart("gráfico: Distribuição de Tokens por Rating", st.plotly_chart, fig, use_container_width=True)
+    st.divider()
 
     st.subheader("Palavras Mais Frequentes por Rating")
     col1, col2 = st.columns(2)
-    for idx, rating in enumerate(sorted(df['rating'].dropna().unique())):
-        if "tokens" in df.columns:
-            top = Counter(word for tokens in df[df['rating'] == rating]['tokens'] for word in tokens).most_common(15)
-            top_df = pd.DataFrame(top, columns=['Palavra', 'Frequência'])
+    for idx, (rating, words) in enumerate(summary["top_words_by_rating"].items()):
+        if words:
+            top_df = words_frame(words)
             fig = px.bar(top_df, x='Palavra', y='Frequência', text='Frequência', title=f'Rating {rating}', color_discrete_sequence=['#2A9D8F'])
             fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', title_x=0.5)
             if idx % 2 == 0:
                 with col1:
-                    st.plotly_chart(fig, use_container_width=True)
+                    instrumentation.chart(f"gráfico: Rating {rating}", st.plotly_chart, fig, use_container_width=True)
             else:
                 with col2:
-                    st.plotly_chart(fig, use_container_width=True)
+                    instrumentation.chart(f"gráfico: Rating {rating}", st.plotly_chart, fig, use_container_width=True)
     st.divider()
 
     st.subheader("Palavras por Polaridade")
     col1, col2 = st.columns(2)
-    for idx, pol in enumerate(sorted(df['polarity'].dropna().unique())):
-        if "tokens" in df.columns:
-            top = Counter(word for tokens in df[df['polarity'] == pol]['tokens'] for word in tokens).most_common(15)
-            top_df = pd.DataFrame(top, columns=['Palavra', 'Frequência'])
+    for idx, (pol, words) in enumerate(summary["top_words_by_polarity"].items()):
+        if words:
+            top_df = words_frame(words)
             fig = px.bar(top_df, x='Palavra', y='Frequência', text='Frequência', title=f'Polaridade {pol}', color_discrete_sequence=['#7C3AED'])
             fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', title_x=0.5)
             if idx % 2 == 0:
                 with col1:
-                    st.plotly_chart(fig, use_container_width=True)
+                    instrumentation.chart(f"gráfico: Polaridade {pol}", st.plotly_chart, fig, use_container_width=True)
             else:
                 with col2:
-                    st.plotly_chart(fig, use_container_width=True)
+                    instrumentation.chart(f"gráfico: Polaridade {pol}", st.plotly_chart, fig, use_container_width=True)
     st.divider()
 
     st.subheader("Distribuição de Sentimentos")
-    df['sentiment'] = pd.cut(df['polarity'], [-1.01, 0, 1.01], labels=['Negativo', 'Positivo'])
-    sent_counts = df['sentiment'].value_counts().reset_index()
-    sent_counts.columns = ['Sentimento', 'Contagem']
+    sent_counts = pd.DataFrame(list(summary["sentiment_counts"].items()), columns=['Sentimento', 'Contagem'])
     fig = px.pie(sent_counts, names='Sentimento', values='Contagem', color='Sentimento', hole=0.4, color_discrete_map={'Negativo': '#FFB86B', 'Positivo': '#28C7A7'})
     fig.update_layout(title='Proporção de Sentimentos', title_x=0.5)
-    st.plotly_chart(fig, use_container_width=True)
+    instrumentation.chart("gráfico: Distribuição de Sentimentos", st.plotly_chart, fig, use_container_width=True)
     st.divider()
 
     st.subheader("Comprimento do Texto vs. Sentimento")
-    if "text_len" in df.columns:
-        fig = px.scatter(df, x='text_len', y='rating', color='polarity', color_continuous_scale='viridis', opacity=0.6)
-        fig.update_layout(title="", title_x=0.5, plot_bgcolor='rgba(0,0,0,0)')
-        st.plotly_chart(fig, use_container_width=True)
+    # Densidade (contagens por faixa de comprimento e rating) + amostra estratificada + reta ajustada
+    reduced = summary["text_len_scatter"]
+    if reduced["bins"]["edges"]:
+        edges = np.asarray(reduced["bins"]["edges"])
+        fig = go.Figure(go.Heatmap(
+            x=(edges[:-1] + edges[1:]) / 2, y=reduced["bins"]["y"], z=np.log1p(reduced["bins"]["counts"]),
+            customdata=reduced["bins"]["counts"], hovertemplate='text_len=%{x}<br>rating=%{y}<br>comentários=%{customdata}<extra></extra>',
+            colorscale='Greys', showscale=False
+        ))
+        sample = pd.DataFrame(reduced["sample"])
+        fig.add_trace(go.Scatter(
+            x=sample['text_len'], y=sample['rating'], mode='markers',
+            marker=dict(color=sample['polarity'], colorscale='viridis', opacity=0.6, colorbar=dict(title='polarity')),
+            name='amostra'
+        ))
+        fit = reduced["fit"]
+        fig.add_trace(go.Scatter(
+            x=edges[[0, -1]], y=fit['slope'] * edges[[0, -1]] + fit['intercept'], mode='lines',
+            line=dict(color='red', width=2), name='tendência'
+        ))
+        fig.update_layout(title="", title_x=0.5, plot_bgcolor='rgba(0,0,0,0)', showlegend=False, xaxis_title='text_len', yaxis_title='rating')
+        instrumentation.chart("gráfico: Comprimento do Texto vs. Sentimento", st.plotly_chart, fig, use_container_width=True)
 
 # === N-grams ===
-with tabs[5]:
-    try:
-        nltk.data.find('tokenizers/punkt')
-    except LookupError:
-        nltk.download('punkt')
-
-    def has_letters_and_length(token):
-        return bool(re.search(r'[a-zA-Z]', token)) and len(token) > 2
-
-    def get_top_ngrams(text_series, n=10, ngram_n=2):
-        words = [
-            word for text in text_series
-            for word in word_tokenize(str(text).lower())
-            if has_letters_and_length(word)
-        ]
-        if len(words) < ngram_n:
-            return []
-        ngram_list = list(ngrams(words, ngram_n))
-        return Counter(ngram_list).most_common(n)
-
+with tabs[5], instrumentation.span("aba: N-Gramas"):
+    # Top n-gramas de todo o corpus para cada (n, sentimento), pré-calculados no resumo
     def plot_ngrams(sentiment_label, ngram_n=2, top_n=10):
-        subset = df[df['sentiment'] == sentiment_label]['review_text_processed']
-        # Seleção de amostra
-        if len(subset) > 2000:
-            subset = subset.sample(2000, random_state=1)
-        top_ngrams = get_top_ngrams(subset, n=top_n, ngram_n=ngram_n)
-        if not top_ngrams:
+        top = summary["top_ngrams"].get(f"{ngram_n}|{sentiment_label}", [])[:top_n]
+        if not top:
             return None
-        labels = [" ".join(gram) for gram, _ in top_ngrams]
-        counts = [count for _, count in top_ngrams]
+        labels = [gram for gram, _ in top]
+        counts = [count for _, count in top]
         fig = px.bar(
             x=counts, y=labels, orientation='h', text=counts, color_discrete_sequence=['#00426A']
         )
@@ -262,12 +251,15 @@ with tabs[5]:
     with col1:
         fig_pos = plot_ngrams('Positivo', ngram_n=ngram_n)
         if fig_pos:
-            st.plotly_chart(fig_pos, use_container_width=True)
+            instrumentation.chart(f"gráfico: {ngram_n}-gramas Positivo", st.plotly_chart, fig_pos, use_container_width=True)
         else:
             st.info(f"Nenhum {ngram_choice_label} encontrado para avaliações positivas.")
     with col2:
         fig_neg = plot_ngrams('Negativo', ngram_n=ngram_n)
         if fig_neg:
-            st.plotly_chart(fig_neg, use_container_width=True)
+            instrumentation.chart(f"gráfico: {ngram_n}-gramas Negativo", st.plotly_chart, fig_neg, use_container_width=True)
         else:
             st.info(f"Nenhum {ngram_choice_label} encontrado para avaliações negativas.")
+
+instrumentation.end_run()
+profile.finish()
@@ -1,10 +1,18 @@
+import startup_profile
+profile = startup_profile.get_profile("PLN_Classica")
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import re
-import spacy
 import plotly.express as px
-import spacy_streamlit
+
+import dataset_store
+import instrumentation
+import model_registry
+import text_analysis
+
+instrumentation.begin_run("PLN_Classica")
 
 # === Configurações da Página ===
 st.set_page_config(page_title="PLN Clássica", layout="wide", page_icon=":books:")
@@ -12,9 +20,12 @@ st.markdown("<h1 style='text-align: center; color: #264653;'>PLN Clássica </h1>
 st.divider()
 
 # === Leitura dos arquivos ===
+@instrumentation.traced("PLN_Classica.load_dataframe")
 @st.cache_data
 def load_dataframe():
-    return pd.read_csv("models_results/part_1/dataset_all.csv")
+    return dataset_store.load_dataset_all(
+        columns=["review_text", "review_text_clean", "review_text_tokenized", "hybrid_sentiment", "score"]
+    )
 
 df = load_dataframe()
 
@@ -26,47 +37,26 @@ def load_pos_tags():
 def load_dep_parse():
     return pd.read_csv("models_results/part_1/dep_parse.csv")
 
-@st.cache_data
-def load_sentilex():
-    return pd.read_csv("models_results/part_1/sentilex.csv")
+# === Modelo SpaCy e léxico (registro compartilhado com a página PLN Moderna) ===
+@instrumentation.traced("PLN_Classica.load_spacy_model", payload=False)
+def load_spacy_model():
+    profile.import_module("spacy")
+    with st.spinner("Carregando o spaCy..."):
+        return model_registry.get_spacy(profile)
 
-sentilex_df = load_sentilex()
-sentilex = dict(zip(sentilex_df["Palavra"].str.lower(), sentilex_df["Polaridade"]))
+@instrumentation.traced("PLN_Classica.visualize_parser", payload=False)
+def visualize_parser(doc, **kwargs):
+    # spacy_streamlit só é importado quando uma árvore é desenhada
+    profile.import_module("spacy_streamlit").visualize_parser(doc, **kwargs)
 
-# === Modelo SpaCy ===
-@st.cache_resource
-def load_spacy_model():
-    return spacy.load("pt_core_news_sm")
-
-nlp = load_spacy_model()
-
-# === Análise Semântica ===
-def semantic_sentiment(text):
-    doc = nlp(text)
-    intensifiers = [token.text.lower() for token in doc if token.pos_ == "ADV" and token.dep_ in ("advmod", "intj")]
-    negators = [token.text.lower() for token in doc if token.dep_ == 'neg']
-    total_score = 0
-    negation = False
-    current_intensity = 1.0
-    for token in doc:
-        if token.text.lower() in negators:
-            negation = not negation
-            continue
-        if token.text.lower() in intensifiers:
-            current_intensity += 1
-            continue
-        word_polarity = sentilex.get(token.text.lower(), 0)
-        if negation:
-            word_polarity *= -1
-        word_polarity *= current_intensity
-        if token.dep_ in ("amod", "advmod"):
-            word_polarity *= 1.5
-        elif token.dep_ == "nsubj":
-            word_polarity *= 1.2
-        total_score += word_polarity
-        current_intensity = 1.0
-        negation = False if token.dep_ in ("punct", "cc") else negation
-    return total_score / len(doc) if len(doc) > 0 else 0
+def load_lexicon():
+    return model_registry.get_lexicon(profile)
+
+# === Análise compartilhada ===
+# Uma passada do spaCy por texto distinto alimenta a árvore, as tabelas e o score (text_analysis.py)
+@instrumentation.traced("PLN_Classica.analyze", payload=False)
+def analyze(texts):
+    return text_analysis.analyze_many(texts, load_spacy_model, load_lexicon)
 
 # === TABS ===
 tabs = st.tabs([
@@ -78,54 +68,52 @@ tabs = st.tabs([
 ])
 
 # === Base de Dados ===
-with tabs[0]:
+with tabs[0], instrumentation.span("aba: Base de Dados"):
     st.subheader("Base de Dados")
     st.dataframe(df[["review_text", "review_text_clean", "review_text_tokenized", "hybrid_sentiment"]].sample(10), use_container_width=True)
     st.divider()
 
 # === Pos-Tags ===
-with tabs[1]:
+with tabs[1], instrumentation.span("aba: Análise Morfológica"):
     st.subheader("Frequência de POS-Tags")
     pos_df = load_pos_tags()
     fig = px.bar(pos_df, x="POS", y="Freq", text="Percent", color_discrete_sequence=["#2596FF"])
     fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', showlegend=False)
-    st.plotly_chart(fig, use_container_width=True)
+    instrumentation.chart("gráfico: POS-Tags", st.plotly_chart, fig, use_container_width=True)
     st.divider()
 
     st.subheader("Exemplos")
-    for i, row in enumerate(df.sample(3, random_state=10).itertuples(), 1):
-        st.write(f"**Review {i}:** {row.review_text}")
-        doc = nlp(row.review_text)
-        data = [(token.text, token.pos_) for token in doc]
-        st.dataframe(pd.DataFrame(data, columns=["Token", "Classe Gramatical"]), use_container_width=True)
+    examples = df.sample(3, random_state=10)["review_text"].tolist()
+    for i, analysis in enumerate(analyze(examples), 1):
+        st.write(f"**Review {i}:** {analysis.text}")
+        st.dataframe(analysis.pos_table(), use_container_width=True)
         st.markdown("---")
 
 # === Dependência Sintática ===
-with tabs[2]:
+with tabs[2], instrumentation.span("aba: Análise Sintática"):
     st.subheader("Frequência de Dependências Sintáticas")
     dep_df = load_dep_parse()
     fig = px.bar(dep_df.head(20), x="Dep", y="Freq", text="Percent", color_discrete_sequence=["#2596FF"])
     fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', showlegend=False)
-    st.plotly_chart(fig, use_container_width=True)
+    instrumentation.chart("gráfico: Dependências", st.plotly_chart, fig, use_container_width=True)
     st.divider()
 
     st.subheader("Exemplos")
-    for i, row in enumerate(df.sample(3, random_state=2).itertuples(), 1):
-        st.write(f"**Review {i}:** {row.review_text}")
-        doc = nlp(row.review_text)
+    examples = df.sample(3, random_state=2)["review_text"].tolist()
+    for i, analysis in enumerate(analyze(examples), 1):
+        st.write(f"**Review {i}:** {analysis.text}")
         with st.expander("Árvore de Dependência"):
-            spacy_streamlit.visualize_parser(doc, title="Parser", key=f"dep_{i}")
-        data = [(token.text, token.dep_, token.head.text) for token in doc]
-        st.dataframe(pd.DataFrame(data, columns=["Token", "Dependência", "Palavra Raiz"]), use_container_width=True)
+            visualize_parser(analysis.doc, title="Parser", key=f"dep_{i}")
+        st.dataframe(analysis.dependency_table(), use_container_width=True)
         st.markdown("---")
 
 # === Distribuição de Sentimentos  ===
-with tabs[3]:
+with tabs[3], instrumentation.span("aba: Sentimento"):
     st.subheader("Distribuição de Sentimento")
     sent_counts = df["hybrid_sentiment"].value_counts().rename_axis("Sentimento").reset_index(name="Contagem")
     fig = px.bar(sent_counts, x="Sentimento", y="Contagem", text="Contagem", color_discrete_sequence=["#2596FF"])
     fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', showlegend=False)
-    st.plotly_chart(fig, use_container_width=True)
+    instrumentation.chart("gráfico: Sentimento", st.plotly_chart, fig, use_container_width=True)
     st.divider()
 
     st.subheader("Exemplos Classificados")
@@ -135,16 +123,16 @@ with tabs[3]:
         st.markdown("---")
 
 # === Análise Personalizada ===
-with tabs[4]:
+with tabs[4], instrumentation.span("aba: Análise Personalizada"):
     st.subheader("Análise Personalizada de Sentimento")
     user_input = st.text_area("Digite uma frase para análise:", placeholder="Exemplo: O serviço foi excelente!")
 
     if user_input.strip():
-        doc = nlp(user_input)
+        analysis = analyze([user_input])[0]
         with st.expander("Visualize a Árvore de Dependência"):
-            spacy_streamlit.visualize_parser(doc, title="Parser", key="parser_input")
+            visualize_parser(analysis.doc, title="Parser", key="parser_input")
 
-        score = semantic_sentiment(user_input)
+        score = analysis.score
         st.divider()
 
         if score > 0:
@@ -164,3 +152,6 @@ with tabs[4]:
             f"<span style='font-size:0.98em;color: #444;'>Score: {score:.2f}</span>",
             unsafe_allow_html=True
         )
+
+instrumentation.end_run()
+profile.finish()
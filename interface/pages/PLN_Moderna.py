@@ -1,13 +1,22 @@
+import startup_profile
+profile = startup_profile.get_profile("PLN_Moderna")
+
 import streamlit as st
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import random
+from importlib.metadata import version as package_version
 from pathlib import Path
 import os
-import spacy
-import pandas as pd
-import json
 
+import compiled_lexicon
+import instrumentation
+import lexicon_scoring
+import model_registry
+import phrase_pool
+import text_analysis
+from inference import predict_sentiment
+from prediction_cache import PredictionCache, fingerprint
+
+instrumentation.begin_run("PLN_Moderna")
 
 # --- Configurações da Página ---
 st.set_page_config(page_title="PLN Moderna", layout="centered", page_icon=":books:")
@@ -16,47 +25,77 @@ st.divider()
 
 
 # --- Funções ---
-@st.cache_resource
-def load_model(checkpoint_path):
-    path = str(checkpoint_path)
-    if not os.path.isdir(path):
-        st.error(f"Diretório do modelo não encontrado em '{path}'.")
-        return None, None
+# O BERT (torch/transformers) e o spaCy ficam no registro de modelos (uma instância por processo)
+# e só são carregados quando alguma resposta precisa deles
+@instrumentation.traced("PLN_Moderna.load_model", payload=False)
+def load_model():
     try:
-        tokenizer = AutoTokenizer.from_pretrained(path)
-        model = AutoModelForSequenceClassification.from_pretrained(path)
-        return tokenizer, model
+        profile.import_module("torch")
+        profile.import_module("transformers")
+        with st.spinner("Carregando o modelo treinado..."):
+            return model_registry.get_bert(profile)
     except Exception as e:
         st.error(f"Erro ao carregar modelo: {e}")
         return None, None
 
-def predict_sentiment(text, tokenizer, model):
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-    with torch.no_grad():
-        logits = model(**inputs).logits
-    predicted_class_id = logits.argmax().item()
-    if predicted_class_id == 0:
-        return "NEGATIVA"
-    else:
-        return "POSITIVA"
-
-model_path = 'models_results/part_2/final_model_weights'
+model_path = model_registry.MODEL_PATH
+sentilex_path = model_registry.SENTILEX_PATH
+spacy_model_name = model_registry.SPACY_MODEL
+model_precision = model_registry.MODEL_PRECISION
 
-with st.spinner("Carregando o modelo treinado..."):
-    tokenizer, model = load_model(model_path)
+@st.cache_resource
+def load_prediction_caches(checkpoint_path, precision):
+    # PLN_CACHE_DB habilita a camada em disco (SQLite), que sobrevive a reinícios
+    db_path = os.environ.get("PLN_CACHE_DB")
+    bert_version = phrase_pool.model_version(checkpoint_path, precision)
+    # Versão lida dos metadados do pacote, sem importar o spaCy
+    lexicon_version = fingerprint([sentilex_path, lexicon_scoring.__file__, compiled_lexicon.__file__], spacy_model_name, package_version("spacy"))
+    return (
+        PredictionCache("bert", bert_version, db_path=db_path),
+        PredictionCache("lexicon", lexicon_version, db_path=db_path),
+    )
+
+bert_cache, lexicon_cache = load_prediction_caches(model_path, model_precision)
+
+def bert_sentiment(text):
+    tokenizer, model = load_model()
+    with instrumentation.span("PLN_Moderna.predict_sentiment", payload=text):
+        return predict_sentiment(text, tokenizer, model)
+
+def cached_predict_sentiment(text):
+    return bert_cache.get_or_compute(text, bert_sentiment)
+
+@st.cache_data
+def load_phrases():
+    return phrase_pool.load_phrases()
+
+EXAMPLE_PHRASES = load_phrases()
+
+# Lê a tabela pré-calculada das frases do jogo; o modelo só é carregado se ela estiver desatualizada
+@instrumentation.traced("PLN_Moderna.load_phrase_table")
+@st.cache_resource(show_spinner="Pré-calculando as frases do jogo...")
+def load_phrase_table(checkpoint_path, precision):
+    version = phrase_pool.model_version(checkpoint_path, precision)
+    table = phrase_pool.read_table(version)
+    if table is not None and all(p in table for p in EXAMPLE_PHRASES):
+        return table
+    tokenizer, model = load_model()
+    if not (tokenizer and model):
+        return table or {}
+    return phrase_pool.load_table(EXAMPLE_PHRASES, tokenizer, model, version)
+
+phrase_table = load_phrase_table(model_path, model_precision)
 
 tabs = st.tabs(["🎮 Jogo", "✍️ Análise Personalizada"])
 
 # === ABA: Jogo ===
-with tabs[0]:
+with tabs[0], instrumentation.span("aba: Jogo"):
     st.subheader("Jogo de Análise de Sentimentos")
-    with open("data/frases.json", "r", encoding="utf-8") as f:
-        EXAMPLE_PHRASES = json.load(f)
 
-    if tokenizer and model:
+    if phrase_table:
         if 'game' not in st.session_state:
             st.session_state.game = {
-                'phrases': random.sample(EXAMPLE_PHRASES, 5),
+                'phrases': random.sample([p for p in EXAMPLE_PHRASES if p in phrase_table], 5),
                 'current_index': 0,
                 'results': []
             }
@@ -103,7 +142,7 @@ with tabs[0]:
                 game['results'].append({
                     'phrase': current_phrase,
                     'your_answer': choice,
-                    'model_answer': predict_sentiment(current_phrase, tokenizer, model)
+                    'model_answer': phrase_table.get(current_phrase) or cached_predict_sentiment(current_phrase)
                 })
                 game['current_index'] += 1
                 st.rerun()
@@ -117,58 +156,34 @@ with tabs[0]:
         st.warning("O modelo não pôde ser carregado. Verifique o diretório.")
 
 # === ABA: ANÁLISE PERSONALIZADA ===
-@st.cache_resource
-def load_sentilex():
-    sentilex_df = pd.read_csv("models_results/part_1/sentilex.csv")
-    return dict(zip(sentilex_df["Palavra"].str.lower(), sentilex_df["Polaridade"]))
-sentilex = load_sentilex()
-
-@st.cache_resource
+@instrumentation.traced("PLN_Moderna.load_spacy_model", payload=False)
 def load_spacy_model():
-    return spacy.load("pt_core_news_sm")
-nlp = load_spacy_model()
+    profile.import_module("spacy")
+    with st.spinner("Carregando o spaCy..."):
+        return model_registry.get_spacy(profile)
 
+@instrumentation.traced("PLN_Moderna.semantic_sentiment", payload=False)
 def semantic_sentiment(text):
-    doc = nlp(text)
-    intensifiers = [t.text.lower() for t in doc if t.pos_ == "ADV" and t.dep_ in ("advmod", "intj")]
-    negators = [t.text.lower() for t in doc if t.dep_ == 'neg']
-    score, negation, intensity = 0, False, 1.0
-    for token in doc:
-        word = token.text.lower()
-        if word in negators:
-            negation = not negation
-            continue
-        if word in intensifiers:
-            intensity += 1
-            continue
-        pol = sentilex.get(word, 0)
-        if negation: pol *= -1
-        pol *= intensity
-        if token.dep_ in ("amod", "advmod"):
-            pol *= 1.5
-        elif token.dep_ == "nsubj":
-            pol *= 1.2
-        score += pol
-        intensity = 1.0
-        if token.dep_ in ("punct", "cc"): negation = False
-    return score / max(1, len(doc))
-
-with tabs[1]:
+    # Mesma análise memoizada da página PLN Clássica: um texto já anotado lá não passa de novo pelo spaCy
+    return text_analysis.analyze(text, load_spacy_model, lambda: model_registry.get_lexicon(profile)).score
+
+with tabs[1], instrumentation.span("aba: Análise Personalizada"):
     st.subheader("Análise Personalizada de Sentimento")
     user_input = st.text_area("Digite uma frase para análise:", placeholder="Exemplo: O serviço foi excelente!")
 
     if user_input.strip():
-        score = semantic_sentiment(user_input)
+        score = lexicon_cache.get_or_compute(user_input, semantic_sentiment)
         sent_classic = "Positivo" if score > 0 else "Negativo"
         classic_color = "#43aa8b" if score > 0 else "#e63946"
         classic_icon = "👍" if score > 0 else "👎"
 
+        tokenizer, model = load_model()
         if tokenizer and model:
-            bert_sentiment = predict_sentiment(user_input, tokenizer, model)
-            bert_color = "#43aa8b" if bert_sentiment == "POSITIVA" else "#e63946"
-            bert_icon = "👍" if bert_sentiment == "POSITIVA" else "👎"
+            bert_label = cached_predict_sentiment(user_input)
+            bert_color = "#43aa8b" if bert_label == "POSITIVA" else "#e63946"
+            bert_icon = "👍" if bert_label == "POSITIVA" else "👎"
         else:
-            bert_sentiment = "Modelo não carregado"
+            bert_label = "Modelo não carregado"
             bert_color, bert_icon = "#bcbcbc", "❓"
 
         st.divider()
@@ -186,6 +201,21 @@ with tabs[1]:
         with col2:
             st.markdown("<b>Modelo BERTimbau</b>", unsafe_allow_html=True)
             st.markdown(
-                f"<span style='font-size:1.15em;color:{bert_color};font-weight:600'>{bert_sentiment} {bert_icon}</span>",
+                f"<span style='font-size:1.15em;color:{bert_color};font-weight:600'>{bert_label} {bert_icon}</span>",
                 unsafe_allow_html=True
             )
+
+# === Estatísticas do cache ===
+with st.sidebar:
+    st.markdown("**Cache de predições**")
+    for name, cache in (("BERT", bert_cache), ("Léxico", lexicon_cache)):
+        stats = cache.stats()
+        st.caption(f"{name}: {stats['hits']} acertos / {stats['misses']} faltas ({stats['hit_rate']:.0%})")
+    st.markdown("**Modelos carregados**")
+    for row in model_registry.registry.stats():
+        if row["loaded"]:
+            memory = row["memory_mb"] if row["memory_mb"] is not None else row["rss_delta_mb"]
+            st.caption(f"{row['name']}: {memory} MB, carregado em {row['load_s']}s")
+
+instrumentation.end_run()
+profile.finish()
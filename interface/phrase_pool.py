@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+'''
+Pré-calcula as respostas do BERT para todas as frases do jogo (data/frases.json)
+e salva numa tabela ao lado do arquivo de frases.
+
+Uso (a partir da pasta interface):
+    python phrase_pool.py
+'''
+import argparse
+import json
+import os
+
+from inference import PRECISIONS, load_checkpoint, checkpoint_path, predict_batch
+from prediction_cache import fingerprint
+
+PHRASES_PATH = "data/frases.json"
+SIDECAR_PATH = "data/frases_predictions.json"
+MODEL_PATH = "models_results/part_2/final_model_weights"
+
+
+def load_phrases(path=PHRASES_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def model_version(base_path, precision="fp32"):
+    return fingerprint([checkpoint_path(base_path, precision)], precision)
+
+
+'''
+this function scores the whole phrase pool in a single batched pass
+'''
+def score_pool(phrases, tokenizer, model, batch_size=32):
+    unique = list(dict.fromkeys(phrases))
+    labels, _ = predict_batch(unique, tokenizer, model, batch_size=batch_size)
+    return dict(zip(unique, labels))
+
+
+def save_table(table, version, path=SIDECAR_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "predictions": table}, f, indent=2, ensure_ascii=False)
+
+
+def read_table(version, path=SIDECAR_PATH):
+    # Descarta a tabela se ela foi gerada por outro modelo/precisão
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != version:
+        return None
+    return data["predictions"]
+
+
+'''
+this function returns the phrase -> label table, reading the sidecar when it matches
+the loaded model and scoring the pool (and refreshing the sidecar) otherwise
+'''
+def load_table(phrases, tokenizer, model, version, path=SIDECAR_PATH):
+    table = read_table(version, path)
+    missing = [p for p in phrases if table is None or p not in table]
+    if missing:
+        table = dict(table or {})
+        table.update(score_pool(missing, tokenizer, model))
+        try:
+            save_table(table, version, path)
+        except OSError:
+            pass
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--precision", default="fp32", choices=list(PRECISIONS))
+    parser.add_argument("--phrases", default=PHRASES_PATH)
+    parser.add_argument("--output", default=SIDECAR_PATH)
+    args = parser.parse_args()
+
+    tokenizer, model = load_checkpoint(args.model, args.precision)
+    phrases = load_phrases(args.phrases)
+    table = score_pool(phrases, tokenizer, model)
+    save_table(table, model_version(args.model, args.precision), args.output)
+    print(f"{len(table)} frases pontuadas em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+def normalize_text(text):
+    # Normaliza unicode e espaços; a caixa é mantida porque o BERTimbau é cased
+    return " ".join(unicodedata.normalize("NFC", str(text)).split())
+
+
+# Digest dos arquivos grandes (pesos do modelo) guardado ao lado de cada arquivo
+DIGEST_SUFFIX = ".sha1"
+
+
+def _hash_file(path, block_size=2**20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+'''
+this function returns the content digest of a large file, reusing the one stored
+next to it while size and mtime match; a copy or checkout only costs one re-hash
+and yields the same digest, so the caches keyed on it stay valid
+'''
+def file_digest(path):
+    stat = os.stat(path)
+    stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+    sidecar = path + DIGEST_SUFFIX
+    try:
+        with open(sidecar, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("stamp") == stamp:
+            return saved["sha1"]
+    except (OSError, ValueError, KeyError):
+        pass
+    digest = _hash_file(path)
+    try:
+        with open(sidecar, "w", encoding="utf-8") as f:
+            json.dump({"stamp": stamp, "sha1": digest}, f)
+    except OSError:
+        # Pasta somente leitura: o digest é recalculado na próxima vez
+        pass
+    return digest
+
+
+'''
+this function builds a version fingerprint from the content of files (small files
+read directly, large ones through their stored digest) plus any extra values,
+e.g. the model precision
+'''
+def fingerprint(paths, *extra, max_hash_bytes=2**20):
+    digest = hashlib.sha1()
+    files = []
+    for path in paths:
+        path = str(path)
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if not name.endswith(DIGEST_SUFFIX)
+            )
+        else:
+            files.append(path)
+    for path in files:
+        if not os.path.isfile(path):
+            continue
+        digest.update(os.path.basename(path).encode())
+        if os.path.getsize(path) <= max_hash_bytes:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        else:
+            digest.update(file_digest(path).encode())
+    for value in extra:
+        digest.update(str(value).encode())
+    return digest.hexdigest()[:16]
+
+
+class PredictionCache:
+    '''
+    Cache de predições com uma camada LRU em memória e uma camada SQLite opcional
+    em disco. A chave é o hash do texto normalizado + namespace + fingerprint do
+    modelo/léxico, então trocar os pesos ou o léxico invalida as entradas antigas.
+    get_or_compute passa o texto normalizado para a função de cálculo.
+    '''
+
+    def __init__(self, namespace, version, max_items=4096, db_path=None):
+        self.namespace = namespace
+        self.version = version
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.commit()
+
+    def key(self, text):
+        raw = f"{self.namespace}\0{self.version}\0{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def get(self, text, default=None):
+        key = self.key(text)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM predictions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+            self.misses += 1
+            return default
+
+    def put(self, text, value):
+        key = self.key(text)
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO predictions (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+                self._db.commit()
+
+    def get_or_compute(self, text, compute):
+        # O valor é calculado sobre o mesmo texto normalizado que gerou a chave:
+        # "bom  filme" e "bom filme" dividem a entrada e precisam dar o mesmo resultado
+        text = normalize_text(text)
+        value = self.get(text, _MISSING)
+        if value is _MISSING:
+            value = compute(text)
+            self.put(text, value)
+        return value
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_rate": self.hits / total if total else 0.0,
+            "memory_items": len(self._memory),
+        }
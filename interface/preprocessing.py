@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+'''
+Pré-processamento do corpus com os kernels vetorizados do Arrow (pyarrow.compute),
+em blocos, no lugar dos .apply linha a linha do dataset_code.ipynb.
+
+As regras são as mesmas do notebook:
+- review_text_clean: minúsculas, tudo que não é letra (a-z, à-ÿ) ou espaço vira
+  espaço, espaços repetidos são colapsados e as pontas removidas;
+- review_text_tokenized: review_text_clean separado por espaços;
+- review_text_nostop: tokens sem as stopwords do NLTK (português) e sem tokens
+  de um caractere.
+
+Uso:
+    python interface/preprocessing.py data.csv --output data_preprocessed.parquet
+    python interface/preprocessing.py data.csv --benchmark 20000
+'''
+import argparse
+import re
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+TEXT_COLUMN = "review_text"
+OUTPUT_COLUMNS = ("review_text_clean", "review_text_tokenized", "review_text_nostop")
+# Mesma classe de caracteres do clean_text do notebook
+NON_LETTER_PATTERN = r"[^a-zà-ÿ\s]"
+CHUNK_SIZE = 50000
+
+
+@lru_cache(maxsize=1)
+def load_stopwords():
+    from nltk.corpus import stopwords
+    try:
+        return frozenset(stopwords.words("portuguese"))
+    except LookupError:
+        raise LookupError('Stopwords do NLTK não encontradas; execute nltk.download("stopwords")') from None
+
+
+def clean_texts(texts):
+    texts = pc.utf8_lower(pc.fill_null(texts, ""))
+    texts = pc.replace_substring_regex(texts, NON_LETTER_PATTERN, " ")
+    texts = pc.replace_substring_regex(texts, r"\s+", " ")
+    return pc.utf8_trim_whitespace(texts)
+
+
+def _filter_lists(lists, keep):
+    # Remonta as listas mantendo só os valores marcados em `keep` (vetor sobre os valores achatados)
+    parents = pc.list_parent_indices(lists).to_numpy()
+    keep = np.asarray(keep, dtype=bool)
+    counts = np.bincount(parents[keep], minlength=len(lists))
+    offsets = np.zeros(len(lists) + 1, dtype=np.int32)
+    np.cumsum(counts, out=offsets[1:])
+    values = pc.list_flatten(lists).filter(pa.array(keep))
+    return pa.ListArray.from_arrays(pa.array(offsets), values)
+
+
+def tokenize(clean):
+    lists = pc.utf8_split_whitespace(clean)
+    if isinstance(lists, pa.ChunkedArray):
+        lists = lists.combine_chunks()
+    # "".split() é [] no Python; o split do Arrow devolve [""] para textos vazios
+    flat = pc.list_flatten(lists)
+    return _filter_lists(lists, pc.not_equal(flat, "").to_numpy(zero_copy_only=False))
+
+
+def remove_stopwords(tokens, stopwords=None):
+    stopwords = load_stopwords() if stopwords is None else stopwords
+    flat = pc.list_flatten(tokens)
+    keep = pc.and_(
+        pc.invert(pc.is_in(flat, value_set=pa.array(sorted(stopwords), type=flat.type))),
+        pc.greater(pc.utf8_length(flat), 1),
+    )
+    return _filter_lists(tokens, keep.to_numpy(zero_copy_only=False))
+
+
+'''
+this function builds the three preprocessed columns for one chunk of raw texts
+'''
+def preprocess_chunk(texts, stopwords=None):
+    if not isinstance(texts, (pa.Array, pa.ChunkedArray)):
+        texts = pa.array(pd.Series(texts, dtype=object).where(pd.notna(texts), None), type=pa.string())
+    clean = clean_texts(texts)
+    tokens = tokenize(clean)
+    return {
+        "review_text_clean": clean,
+        "review_text_tokenized": tokens,
+        "review_text_nostop": remove_stopwords(tokens, stopwords),
+    }
+
+
+def preprocess_frame(df, column=TEXT_COLUMN, chunk_size=CHUNK_SIZE, stopwords=None):
+    # Colunas novas como tipos Arrow (listas nativas), gravadas direto em Parquet
+    parts = {name: [] for name in OUTPUT_COLUMNS}
+    for start in range(0, len(df), chunk_size):
+        for name, values in preprocess_chunk(df[column].iloc[start:start + chunk_size], stopwords).items():
+            parts[name].append(values)
+    out = df.copy()
+    for name, chunks in parts.items():
+        array = pa.chunked_array(chunks) if chunks else pa.chunked_array([], pa.string() if name == "review_text_clean" else pa.list_(pa.string()))
+        out[name] = pd.Series(pd.arrays.ArrowExtensionArray(array), index=df.index)
+    return out
+
+
+def iter_input(path, chunk_size):
+    if str(path).endswith(".parquet"):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield pa.Table.from_batches([batch])
+    else:
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            yield pa.Table.from_pandas(chunk, preserve_index=False)
+
+
+'''
+this function streams the input in chunks and writes every row with the three
+preprocessed columns to parquet in a single pass
+'''
+def preprocess_file(path, output, column=TEXT_COLUMN, chunk_size=CHUNK_SIZE):
+    stopwords = load_stopwords()
+    writer, rows = None, 0
+    try:
+        for table in iter_input(path, chunk_size):
+            for name, values in preprocess_chunk(table.column(column).cast(pa.string()), stopwords).items():
+                if name in table.column_names:
+                    table = table.drop_columns([name])
+                table = table.append_column(name, values)
+            if writer is None:
+                writer = pq.ParquetWriter(output, table.schema, compression="zstd")
+            writer.write_table(table.cast(writer.schema))
+            rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+# Implementação original (notebook), usada apenas no benchmark e na verificação de paridade
+def reference_clean_text(text):
+    text = text.lower()
+    text = re.sub(NON_LETTER_PATTERN, " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+
+def reference_preprocess(texts, stopwords):
+    clean = texts.apply(reference_clean_text)
+    tokens = clean.apply(lambda text: text.split())
+    nostop = tokens.apply(lambda toks: [tok for tok in toks if tok not in stopwords and len(tok) > 1])
+    return clean, tokens, nostop
+
+
+def benchmark(texts, stopwords):
+    texts = texts.fillna("").astype(str).reset_index(drop=True)
+    start = time.perf_counter()
+    expected = reference_preprocess(texts, stopwords)
+    apply_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    got = preprocess_chunk(texts, stopwords)
+    arrow_s = time.perf_counter() - start
+
+    matches = {
+        name: float(np.mean([list(a) == list(b) if isinstance(a, list) else a == b
+                             for a, b in zip(reference, values.to_pylist())]))
+        for (name, values), reference in zip(got.items(), expected)
+    }
+    return {
+        "linhas": len(texts),
+        "linhas_por_s_apply": len(texts) / apply_s,
+        "linhas_por_s_arrow": len(texts) / arrow_s,
+        "speedup": apply_s / arrow_s,
+        "linhas_identicas": matches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV ou Parquet com a coluna de texto")
+    parser.add_argument("--column", default=TEXT_COLUMN)
+    parser.add_argument("--output", help="Parquet de saída com as colunas pré-processadas")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--benchmark", type=int, metavar="N", help="compara com o .apply do notebook em N linhas")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        texts = next(iter_input(args.input, args.benchmark)).column(args.column).to_pandas()
+        report = benchmark(texts, load_stopwords())
+        print(f"{report['linhas']} linhas: apply {report['linhas_por_s_apply']:.0f} linhas/s | "
+              f"arrow {report['linhas_por_s_arrow']:.0f} linhas/s | speedup {report['speedup']:.1f}x")
+        for name, share in report["linhas_identicas"].items():
+            print(f"  {name}: {share:.2%} das linhas idênticas ao notebook")
+
+    if args.output:
+        start = time.perf_counter()
+        rows = preprocess_file(args.input, args.output, args.column, args.chunk_size)
+        elapsed = time.perf_counter() - start
+        print(f"{rows} linhas pré-processadas em {elapsed:.1f}s ({rows / elapsed:.0f} linhas/s) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
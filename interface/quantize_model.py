@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+'''
+Exporta uma cópia do BERTimbau ajustado com as camadas Linear quantizadas
+dinamicamente em int8 e gera um relatório de concordância/acurácia contra o
+modelo em float32 numa fatia separada do b2w.
+
+Uso (a partir da pasta interface):
+    python quantize_model.py --data data/b2w.csv --n 2000
+'''
+import argparse
+import json
+import os
+import time
+
+import pandas as pd
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from inference import LABELS, QUANTIZED_WEIGHTS, checkpoint_path, predict_batch, quantize
+
+MODEL_PATH = "models_results/part_2/final_model_weights"
+REPORT_NAME = "quantization_report.json"
+
+
+def dir_size_mb(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 2**20
+
+
+def load_held_out(data_path, n, fold, seed):
+    df = pd.read_csv(data_path)
+    df = df.dropna(subset=["review_text", "polarity"])
+    # Usa um fold fixo quando disponível, para não avaliar em dados de treino
+    if fold is not None and "kfold_polarity" in df.columns:
+        df = df[df["kfold_polarity"] == fold]
+    df = df.sample(min(n, len(df)), random_state=seed)
+    labels = [LABELS[1] if p > 0 else LABELS[0] for p in df["polarity"]]
+    return df["review_text"].astype(str).tolist(), labels
+
+
+def evaluate(texts, tokenizer, model, batch_size):
+    start = time.perf_counter()
+    preds, _ = predict_batch(texts, tokenizer, model, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    return preds, len(texts) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--data", default="data/b2w.csv")
+    parser.add_argument("--n", type=int, default=2000, help="tamanho da fatia de avaliação")
+    parser.add_argument("--fold", type=int, default=0, help="valor de kfold_polarity usado como fatia separada")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    output = checkpoint_path(args.model, "int8")
+    os.makedirs(output, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForSequenceClassification.from_pretrained(args.model).eval()
+    qmodel = quantize(model)
+
+    # Salva config, tokenizer e o state_dict quantizado lado a lado
+    model.config.save_pretrained(output)
+    tokenizer.save_pretrained(output)
+    torch.save(qmodel.state_dict(), os.path.join(output, QUANTIZED_WEIGHTS))
+    print(f"Modelo int8 salvo em {output}")
+
+    texts, labels = load_held_out(args.data, args.n, args.fold, args.seed)
+    fp32_preds, fp32_speed = evaluate(texts, tokenizer, model, args.batch_size)
+    int8_preds, int8_speed = evaluate(texts, tokenizer, qmodel, args.batch_size)
+
+    def accuracy(preds):
+        return sum(p == y for p, y in zip(preds, labels)) / len(labels)
+
+    report = {
+        "n_textos": len(texts),
+        "fold": args.fold,
+        "concordancia_fp32_int8": sum(a == b for a, b in zip(fp32_preds, int8_preds)) / len(texts),
+        "acuracia_fp32": accuracy(fp32_preds),
+        "acuracia_int8": accuracy(int8_preds),
+        "textos_por_s_fp32": fp32_speed,
+        "textos_por_s_int8": int8_speed,
+        "speedup": int8_speed / fp32_speed,
+        "tamanho_mb_fp32": dir_size_mb(args.model),
+        "tamanho_mb_int8": dir_size_mb(output),
+    }
+    with open(os.path.join(output, REPORT_NAME), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    for key, value in report.items():
+        print(f"{key:>24}: {value:.4f}" if isinstance(value, float) else f"{key:>24}: {value}")
+
+
+if __name__ == "__main__":
+    main()
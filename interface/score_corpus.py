@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+'''
+Pontua um corpus inteiro (CSV ou Parquet) fora do Streamlit com o BERTimbau,
+com o método do SentiLex ou com os dois.
+
+A entrada é lida em blocos de --chunk-size linhas e cada bloco vira um
+arquivo part-NNNNN.parquet na pasta de saída. O _checkpoint.json da pasta
+registra os blocos já gravados: se o processo for interrompido, rodar o mesmo
+comando de novo continua do primeiro bloco que faltava. Se o arquivo de entrada
+(tamanho ou data de modificação) ou o léxico mudaram, a retomada é recusada. O BERT roda em lotes
+(inference.iter_predictions); o SentiLex roda num pool de processos, cada um
+com o seu spaCy e o léxico compilado aberto com mmap (a compilação, quando
+necessária, acontece uma única vez no processo principal, antes do pool).
+
+O resultado pode ser lido com pd.read_parquet(<pasta de saída>).
+
+Uso (a partir da pasta interface):
+    python score_corpus.py data/b2w.parquet --method both --output models_results/b2w_scores
+'''
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+import compiled_lexicon
+import lexicon_scoring
+from inference import PRECISIONS, iter_predictions, load_checkpoint
+
+MODEL_PATH = "models_results/part_2/final_model_weights"
+SPACY_MODEL = "pt_core_news_sm"
+# Arquivos iniciados por "_" são ignorados pelo pyarrow ao ler a pasta como dataset
+CHECKPOINT = "_checkpoint.json"
+
+_worker = {}
+
+
+def iter_chunks(path, column, chunk_size):
+    # Apenas a coluna de texto é lida, bloco a bloco
+    if str(path).endswith(".parquet"):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=[column]):
+            yield batch.column(0).to_pandas()
+    else:
+        for chunk in pd.read_csv(path, usecols=[column], chunksize=chunk_size):
+            yield chunk[column]
+
+
+def _init_lexicon_worker(spacy_model, compiled_path):
+    import spacy
+    _worker["nlp"] = spacy.load(spacy_model, exclude=["ner"])
+    # A tabela já foi compilada pelo processo principal: aqui ela só é aberta com mmap
+    _worker["lexicon"] = compiled_lexicon.open_compiled(compiled_path)
+
+
+def _score_lexicon(texts):
+    return lexicon_scoring.score_texts(_worker["nlp"], texts, _worker["lexicon"])
+
+
+def score_lexicon(pool, texts, n_workers):
+    # Divide o bloco entre os processos e junta os scores na ordem original
+    parts = [list(p) for p in np.array_split(np.asarray(texts, dtype=object), n_workers) if len(p)]
+    return np.concatenate(list(pool.map(_score_lexicon, parts)))
+
+
+def score_bert(tokenizer, model, texts, batch_size):
+    labels, positive = [], []
+    for label, p in iter_predictions(texts, tokenizer, model, batch_size=batch_size):
+        labels.append(label)
+        positive.append(p[1])
+    return labels, positive
+
+
+def read_checkpoint(output):
+    path = Path(output) / CHECKPOINT
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_checkpoint(output, state):
+    # Gravação atômica: o checkpoint nunca fica pela metade se o processo morrer aqui
+    tmp = Path(output) / (CHECKPOINT + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, Path(output) / CHECKPOINT)
+
+
+def write_part(output, index, frame):
+    final = Path(output) / f"part-{index:05d}.parquet"
+    tmp = Path(output) / f"_{final.name}.tmp"
+    frame.to_parquet(tmp, index=False, compression="zstd")
+    os.replace(tmp, final)
+
+
+'''
+this function scores the corpus chunk by chunk, skipping the chunks recorded in
+the checkpoint of a previous run with the same settings
+'''
+def score_corpus(args):
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    methods = ["bert", "lexicon"] if args.method == "both" else [args.method]
+    compiled_path = None
+    if "lexicon" in methods:
+        # Compila uma única vez aqui, antes do pool, para os processos não recompilarem ao mesmo tempo
+        compiled_path = compiled_lexicon.ensure_compiled(args.sentilex)
+    stat = os.stat(args.input)
+    settings = {
+        "input": os.path.abspath(args.input),
+        # Um arquivo de entrada ou léxico alterado não pode continuar os blocos antigos
+        "input_size": stat.st_size,
+        "input_mtime_ns": stat.st_mtime_ns,
+        "column": args.column,
+        "methods": methods,
+        "chunk_size": args.chunk_size,
+        "precision": args.precision if "bert" in methods else None,
+        "lexicon_version": compiled_lexicon.source_version(args.sentilex) if compiled_path else None,
+    }
+    state = read_checkpoint(output)
+    if state is not None and state["settings"] != settings:
+        raise SystemExit(f"{output} tem um checkpoint de outra configuração; use outra pasta de saída.")
+    if state is None:
+        state = {"settings": settings, "completed_chunks": 0, "rows": 0}
+    if state["completed_chunks"]:
+        print(f"Retomando a partir do bloco {state['completed_chunks']} ({state['rows']} linhas já pontuadas)")
+
+    tokenizer = model = pool = None
+    if "bert" in methods:
+        tokenizer, model = load_checkpoint(args.model, args.precision)
+    if "lexicon" in methods:
+        pool = ProcessPoolExecutor(args.workers, initializer=_init_lexicon_worker, initargs=(SPACY_MODEL, str(compiled_path)))
+
+    start = time.perf_counter()
+    scored = 0
+    try:
+        for index, texts in enumerate(iter_chunks(args.input, args.column, args.chunk_size)):
+            if index < state["completed_chunks"]:
+                continue
+            texts = texts.fillna("").astype(str).tolist()
+            frame = pd.DataFrame({"row_id": np.arange(state["rows"], state["rows"] + len(texts))})
+            if "bert" in methods:
+                frame["bert_label"], frame["bert_prob_positive"] = score_bert(tokenizer, model, texts, args.batch_size)
+            if "lexicon" in methods:
+                scores = score_lexicon(pool, texts, args.workers)
+                frame["lexicon_score"] = scores
+                frame["lexicon_label"] = np.where(scores > 0, "Positivo", "Negativo")
+
+            write_part(output, index, frame)
+            state["completed_chunks"] = index + 1
+            state["rows"] += len(texts)
+            write_checkpoint(output, state)
+            scored += len(texts)
+            elapsed = time.perf_counter() - start
+            print(f"bloco {index}: {state['rows']} linhas ({scored / elapsed:.1f} linhas/s)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV ou Parquet de entrada")
+    parser.add_argument("--column", default="review_text")
+    parser.add_argument("--method", default="both", choices=["bert", "lexicon", "both"])
+    parser.add_argument("--output", required=True, help="pasta com os part-*.parquet e o checkpoint")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--precision", default="fp32", choices=list(PRECISIONS))
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--sentilex", default=lexicon_scoring.SENTILEX_PATH)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    args = parser.parse_args()
+
+    state = score_corpus(args)
+    print(f"Concluído: {state['rows']} linhas em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+'''
+Perfil de inicialização a frio das páginas do Streamlit: tempo de import de
+cada dependência pesada, tempo de carga de cada modelo e tempo até o fim da
+primeira renderização da página no processo.
+
+Cada página obtém o seu perfil com get_profile("<página>"), importa as
+dependências pesadas com profile.import_module(...) no ponto em que elas são
+usadas, envolve as cargas de modelo com profile.span(...) e chama
+profile.finish() no fim do script. O tempo de renderização é o da primeira
+execução da página no processo; imports e cargas feitos sob demanda em
+execuções posteriores (BERT, spaCy) são somados ao relatório, que com
+PLN_STARTUP_PROFILE=<pasta> é salvo (e regravado a cada nova carga) em
+<pasta>/<página>.json.
+
+Uso:
+    PLN_STARTUP_PROFILE=startup_profiles streamlit run interface/home.py
+    python interface/startup_profile.py startup_profiles
+'''
+import argparse
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+PROFILE_DIR_ENV = "PLN_STARTUP_PROFILE"
+
+_PROCESS_START = time.perf_counter()
+_profiles = {}
+_lock = threading.Lock()
+
+
+class StartupProfile:
+    def __init__(self, page):
+        self.page = page
+        self.started = time.perf_counter()
+        self.imports = {}
+        self.loads = {}
+        self.first_render = None
+
+    def import_module(self, name):
+        # Módulos já carregados (por outra página ou execução) não entram no relatório
+        if name in sys.modules:
+            return sys.modules[name]
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        self.imports[name] = time.perf_counter() - start
+        self._update_report()
+        return module
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.loads[name] = self.loads.get(name, 0.0) + time.perf_counter() - start
+            self._update_report()
+
+    def _update_report(self):
+        # Modelos carregados sob demanda em reexecuções posteriores também entram no relatório
+        if self.first_render is not None:
+            self.dump()
+
+    def finish(self):
+        if self.first_render is not None:
+            return
+        self.first_render = time.perf_counter() - self.started
+        self.dump()
+
+    def report(self):
+        return {
+            "page": self.page,
+            "process_uptime_s": round(self.started - _PROCESS_START, 4),
+            "imports_s": {name: round(t, 4) for name, t in self.imports.items()},
+            "loads_s": {name: round(t, 4) for name, t in self.loads.items()},
+            "first_render_s": None if self.first_render is None else round(self.first_render, 4),
+        }
+
+    def dump(self, directory=None):
+        directory = directory or os.environ.get(PROFILE_DIR_ENV)
+        if not directory:
+            return None
+        path = Path(directory) / f"{self.page}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Cargas em threads diferentes podem regravar o relatório ao mesmo tempo
+        with _lock:
+            tmp = path.with_name(f"_{path.name}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.report(), f, indent=2, ensure_ascii=False)
+            os.replace(tmp, path)
+        return path
+
+
+def get_profile(page):
+    # Um perfil por página e por processo: as reexecuções do Streamlit reaproveitam o mesmo
+    with _lock:
+        if page not in _profiles:
+            _profiles[page] = StartupProfile(page)
+        return _profiles[page]
+
+
+def format_report(report):
+    lines = [f"{report['page']}: primeira renderização em {report['first_render_s']}s"]
+    for section, title in (("imports_s", "import"), ("loads_s", "carga")):
+        for name, seconds in sorted(report[section].items(), key=lambda item: -item[1]):
+            lines.append(f"  {title:<7} {name:<32} {seconds:8.3f}s")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", nargs="?", default=os.environ.get(PROFILE_DIR_ENV, "startup_profiles"))
+    args = parser.parse_args()
+    reports = sorted(Path(args.directory).glob("*.json"))
+    if not reports:
+        print(f"Nenhum perfil encontrado em {args.directory}")
+    for path in reports:
+        with open(path, encoding="utf-8") as f:
+            print(format_report(json.load(f)))
+
+
+if __name__ == "__main__":
+    main()
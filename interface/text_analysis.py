@@ -0,0 +1,123 @@
+'''
+Análise de um texto com uma única passada do spaCy.
+
+analyze(text) devolve uma TextAnalysis com o Doc (usado para desenhar a árvore),
+os tokens, as classes gramaticais, as dependências e o score do SentiLex, todos
+derivados do mesmo Doc. As análises ficam num LRU do processo indexado pelo
+hash do texto (e pelo modelo do spaCy), então cada texto distinto é anotado
+uma única vez, mesmo entre as reexecuções e as sessões do Streamlit. O score
+é guardado junto com a versão do léxico que o calculou.
+'''
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import cached_property
+
+import pandas as pd
+
+import lexicon_scoring
+import model_registry
+
+MAX_ENTRIES = 512
+
+
+class TextAnalysis:
+    def __init__(self, text, doc, load_lexicon=model_registry.get_lexicon):
+        self.text = text
+        self.doc = doc
+        self._load_lexicon = load_lexicon
+        self._scores = {}
+
+    @cached_property
+    def tokens(self):
+        return [t.text for t in self.doc]
+
+    @cached_property
+    def pos(self):
+        return [t.pos_ for t in self.doc]
+
+    @cached_property
+    def arcs(self):
+        # (token, dependência, palavra raiz) na ordem do texto
+        return [(t.text, t.dep_, t.head.text) for t in self.doc]
+
+    @property
+    def score(self):
+        # Memorizado por versão do léxico: um sentilex.csv recompilado gera um score novo
+        lexicon = self._load_lexicon()
+        version = getattr(lexicon, "source_version", None)
+        if version is None:
+            return lexicon_scoring.score_doc(self.doc, lexicon)
+        if version not in self._scores:
+            self._scores[version] = lexicon_scoring.score_doc(self.doc, lexicon)
+        return self._scores[version]
+
+    def pos_table(self):
+        return pd.DataFrame({"Token": self.tokens, "Classe Gramatical": self.pos})
+
+    def dependency_table(self):
+        return pd.DataFrame(self.arcs, columns=["Token", "Dependência", "Palavra Raiz"])
+
+
+class AnalysisCache:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.parses = 0
+        self.hits = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text, model_name):
+        return model_name, hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            analysis = self._entries.get(key)
+            if analysis is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return analysis
+
+    def put(self, key, analysis):
+        # Cada put corresponde a um texto anotado pelo spaCy
+        with self._lock:
+            self.parses += 1
+            self._entries[key] = analysis
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {"entries": len(self._entries), "parses": self.parses, "hits": self.hits}
+
+
+cache = AnalysisCache()
+# Os Docs guardados mantêm o Vocab do spaCy vivo: o cache é esvaziado quando o registro descarrega o modelo
+model_registry.registry.on_unload("spacy", cache.clear)
+
+
+'''
+this function returns one analysis per text, parsing only the texts not in the
+cache, all of them in a single nlp.pipe call
+'''
+def analyze_many(texts, load_nlp=model_registry.get_spacy, load_lexicon=model_registry.get_lexicon):
+    texts = [str(text) for text in texts]
+    keys = [AnalysisCache.key(text, model_registry.SPACY_MODEL) for text in texts]
+    found = {key: cache.get(key) for key in dict.fromkeys(keys)}
+    missing = {key: text for key, text in zip(keys, texts) if found[key] is None}
+    if missing:
+        # O spaCy só é carregado quando algum texto ainda não foi analisado
+        docs = load_nlp().pipe(list(missing.values()))
+        for (key, text), doc in zip(missing.items(), docs):
+            found[key] = TextAnalysis(text, doc, load_lexicon)
+            cache.put(key, found[key])
+    return [found[key] for key in keys]
+
+
+def analyze(text, load_nlp=model_registry.get_spacy, load_lexicon=model_registry.get_lexicon):
+    return analyze_many([text], load_nlp, load_lexicon)[0]
@@ -0,0 +1,37 @@
+'''
+Nuvens de palavras geradas a partir das tabelas de frequência por rating do
+resumo da análise exploratória (eda_summary.py), com
+WordCloud.generate_from_frequencies. Mudar o intervalo de ratings só soma as
+tabelas já calculadas, sem juntar e re-tokenizar o texto das reviews.
+'''
+import io
+from collections import Counter
+
+WIDTH = 800
+HEIGHT = 400
+
+
+def merge_frequencies(tables, ratings):
+    merged = Counter()
+    for rating in ratings:
+        merged.update(dict(tables.get(str(rating), [])))
+    return merged
+
+
+'''
+this function renders a word cloud from a {word: count} dict and returns it as PNG bytes
+'''
+def render_png(frequencies, colormap="viridis", max_words=100, width=WIDTH, height=HEIGHT):
+    if not frequencies:
+        return None
+    # Importado só quando uma nuvem é de fato gerada (as imagens ficam em cache)
+    from wordcloud import WordCloud
+    wc = WordCloud(
+        width=width, height=height,
+        background_color='white',
+        colormap=colormap,
+        max_words=max_words
+    ).generate_from_frequencies(frequencies)
+    buffer = io.BytesIO()
+    wc.to_image().save(buffer, format="PNG")
+    return buffer.getvalue()
@@ -1,20 +1,42 @@
 #!/usr/bin/env python3
 import io
+import os
+import sys
 
 import streamlit as st
-import wandb
-import pandas as pd
 #from datasets import Dataset
 #from sklearn.model_selection import train_test_split
 
+# Os módulos compartilhados (dataset_store etc.) ficam na pasta interface
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "interface"))
+
+import startup_profile
+profile = startup_profile.get_profile("main")
+
+import dataset_store
 import exploratory_analysis
 import extracting_dataset  
+import instrumentation
 
-#if not dataset:
-dataset = extracting_dataset.extracting_dataset() #rodar esse apenas uma vez caso o arquivo nao tenha sido extraido 
-
+# Precisa ser o primeiro comando do Streamlit: o spinner do load_dataset já desenha um elemento
 st.set_page_config(layout="wide")
+
+instrumentation.begin_run("main")
+
+# Visão imutável do dataset, construída uma vez por versão do Parquet e compartilhada entre as sessões
+@instrumentation.traced("main.load_dataset")
+@st.cache_resource(show_spinner="Carregando o dataset...")
+def load_dataset(version):
+    with profile.span("dataset"):
+        return extracting_dataset.extracting_dataset()
+
+extracting_dataset.ensure_store() # a ingestão do zip para Parquet só roda na primeira vez
+dataset = load_dataset(dataset_store.store_version(dataset_store.B2W_STORE))
+
 st.title("Polaridade de Comentários")
 
 st.header("Exploração dos Dados")
 exploratory_analysis.streamlit_show(dataset)
+
+instrumentation.end_run()
+profile.finish()